@@ -0,0 +1,62 @@
+"""
+Measure compiles per second of many small sources through a shared
+``Compiler``, alone and from a thread pool, against ``minify``.
+
+Usage::
+
+    python benchmarks/bench_compiler.py [COUNT] [THREADS]
+"""
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+
+from jscompiler import minify
+from jscompiler.compiler import Compiler
+
+SOURCES = [
+    u'function add(first, second) { return first + second; }',
+    u'var total = 0; for (var index = 0; index < 10; index++) { total += index; }',
+    u'(function (window) { var body = window.document.body; body.className = "ready"; })(this);',
+    u'if (typeof value == "undefined") { value = { name: "default", count: 1 }; }',
+]
+
+def run(function, count):
+    start = time.time()
+    for i in xrange(count):
+        function(SOURCES[i % len(SOURCES)])
+    return time.time() - start
+
+def run_threaded(function, count, threads):
+    pool = ThreadPool(threads)
+    sources = [SOURCES[i % len(SOURCES)] for i in xrange(count)]
+    start = time.time()
+    pool.map(function, sources)
+    elapsed = time.time() - start
+    pool.close()
+    pool.join()
+    return elapsed
+
+def main(argv):
+    count = int(argv[0]) if argv else 5000
+    threads = int(argv[1]) if len(argv) > 1 else 4
+    compiler = Compiler(rename=True)
+    for source in SOURCES:
+        expected = minify(source.encode('utf-8'), rename=True)
+        if compiler.compile(source).encode('utf-8') != expected:
+            sys.stderr.write('output differs for %r\n' % source)
+            return 1
+    baseline = run(
+        lambda source: minify(source.encode('utf-8'), rename=True), count
+    )
+    shared = run(compiler.compile, count)
+    threaded = run_threaded(compiler.compile, count, threads)
+    sys.stdout.write(
+        '%d compiles: minify %.0f/s, Compiler %.0f/s, '
+        'Compiler with %d threads %.0f/s\n' % (
+            count, count / baseline, count / shared, threads, count / threaded
+        )
+    )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,60 @@
+"""
+Measure visits per second of the table dispatching visitors against the
+name based dispatch of the ``bigrig`` visitors.
+
+Usage::
+
+    python benchmarks/bench_dispatch.py FILENAME [FILENAME ...]
+"""
+import sys
+import time
+
+from bigrig import visitor
+
+from jscompiler.code_generator import StringCodeGenerator
+from jscompiler.locator_parser import parse_file
+
+
+class NameDispatchGenerator(StringCodeGenerator):
+    """
+    The string code generator using the name based ``bigrig`` dispatch.
+    """
+    visit = visitor.NodeVisitor.__dict__['visit']
+
+class CountingGenerator(StringCodeGenerator):
+    """
+    Counts the visits a code generation run makes.
+    """
+    count = 0
+
+    def visit(self, node):
+        self.count += 1
+        return super(CountingGenerator, self).visit(node)
+
+def time_generator(generator_class, ast, repeat=3):
+    best = None
+    for i in range(repeat):
+        generator = generator_class()
+        start = time.time()
+        generator.generate(ast)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main(argv):
+    for filename in argv:
+        ast = parse_file(filename)
+        counter = CountingGenerator()
+        counter.generate(ast)
+        table = time_generator(StringCodeGenerator, ast)
+        names = time_generator(NameDispatchGenerator, ast)
+        sys.stdout.write(
+            '%s: %d visits, name dispatch %.0f/s, table dispatch %.0f/s\n' % (
+                filename, counter.count, counter.count / names,
+                counter.count / table
+            )
+        )
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
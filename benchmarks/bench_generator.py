@@ -0,0 +1,42 @@
+"""
+Compare the token consumer pipeline against the direct string emitting code
+generator, checking that both produce identical output.
+
+Usage::
+
+    python benchmarks/bench_generator.py FILENAME [FILENAME ...]
+"""
+import sys
+import time
+
+from jscompiler.code_consumer import print_string
+from jscompiler.code_generator import generate_string
+from jscompiler.locator_parser import parse_file
+
+def best_time(function, ast, repeat=3):
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        result = function(ast)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def main(argv):
+    for filename in argv:
+        ast = parse_file(filename)
+        tokens, expected = best_time(print_string, ast)
+        strings, output = best_time(generate_string, ast)
+        if output.encode('utf-8') != expected:
+            sys.stderr.write('%s: output differs\n' % filename)
+            return 1
+        sys.stdout.write(
+            '%s: consumer %.3fs, string buffer %.3fs (%.2fx)\n' % (
+                filename, tokens, strings, tokens / strings
+            )
+        )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,82 @@
+"""
+Compare parse times of the class-level locator wrappers against the former
+per-instance ``__getattribute__`` hook.
+
+Usage::
+
+    python benchmarks/bench_locators.py FILENAME [FILENAME ...]
+"""
+import sys
+import time
+import types
+from functools import wraps
+
+from bigrig import parser, node
+from bigrig.scanner import make_string_scanner, TokenStreamAllowReserved
+
+from jscompiler.locator_parser import LocatorParser
+
+
+class HookLocatedNodeMixin(object):
+    """
+    The original attribute hook, kept here as the comparison baseline.
+    """
+    def __init__(self, *args, **kwargs):
+        super(HookLocatedNodeMixin, self).__init__(*args, **kwargs)
+        self._method_cache = {}
+
+    def get_next_locator(self):
+        token = self.token_stream.peek()
+        return token.locator
+
+    def wrap_method(self, method):
+        @wraps(method)
+        def wrapped(self, *args, **kwargs):
+            locator = self.get_next_locator()
+            result = method(*args, **kwargs)
+            if isinstance(result, node.Node):
+                result.locator = locator
+            return result
+        return types.MethodType(wrapped, self)
+
+    def __getattribute__(self, name):
+        cache = super(HookLocatedNodeMixin, self).__getattribute__('_method_cache')
+        if name in cache:
+            return cache[name]
+        elif name.startswith('parse_'):
+            original = object.__getattribute__(self, name)
+            wrapped = self.wrap_method(original)
+            cache[name] = wrapped
+            return wrapped
+        return super(HookLocatedNodeMixin, self).__getattribute__(name)
+
+class HookLocatorParser(HookLocatedNodeMixin, parser.Parser):
+    pass
+
+
+def time_parse(parser_class, source, filename, repeat):
+    best = None
+    for i in range(repeat):
+        scanner = make_string_scanner(source, filename, 0, 0, 'utf-8')
+        stream = TokenStreamAllowReserved(scanner)
+        start = time.time()
+        parser_class(stream).parse()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main(argv):
+    repeat = 3
+    for filename in argv:
+        source = open(filename, 'rb').read()
+        hook = time_parse(HookLocatorParser, source, filename, repeat)
+        wrapped = time_parse(LocatorParser, source, filename, repeat)
+        sys.stdout.write(
+            '%s: hook %.3fs, class wrappers %.3fs (%.1f%% faster)\n' % (
+                filename, hook, wrapped, 100.0 * (hook - wrapped) / hook
+            )
+        )
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
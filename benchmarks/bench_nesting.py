@@ -0,0 +1,37 @@
+"""
+Stress code generation with long left-nested expression chains.
+
+Usage::
+
+    python benchmarks/bench_nesting.py [DEPTH]
+
+The depth defaults to 100000 links per chain.
+"""
+import sys
+import time
+
+from jscompiler.code_generator import generate_string
+from jscompiler.locator_parser import parse_string, NO_LOCATIONS
+
+CHAINS = (
+    ('concatenation', u'x=a', u'+a', u';'),
+    ('member calls', u'a', u'.b()', u';'),
+    ('comparisons', u'a', u'<a', u';'),
+)
+
+def main(argv):
+    depth = int(argv[0]) if argv else 100000
+    for name, start, link, end in CHAINS:
+        source = start + link * depth + end
+        ast = parse_string(source.encode('utf-8'), locations=NO_LOCATIONS)
+        begin = time.time()
+        output = generate_string(ast)
+        elapsed = time.time() - begin
+        if output != source[:-1]:
+            sys.stderr.write('%s: output differs from input\n' % name)
+            return 1
+        sys.stdout.write('%s x %d: %.3fs\n' % (name, depth, elapsed))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
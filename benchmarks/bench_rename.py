@@ -0,0 +1,81 @@
+"""
+Compare the single pass renaming engine against the three pass pipeline of
+scope building, reference counting and tree rewriting.
+
+Usage::
+
+    python benchmarks/bench_rename.py FILENAME [FILENAME ...]
+
+Every run takes place in a fresh process. Peak traced memory of the rename
+is reported when ``tracemalloc`` is available, and otherwise the peak
+resident set size of the process, parse included.
+"""
+import multiprocessing
+import sys
+import time
+
+from jscompiler.code_generator import generate_string
+from jscompiler.locator_parser import parse_file
+from jscompiler.profiling import get_max_rss, resource, tracemalloc
+from jscompiler.rename import (
+    add_rename_scopes, add_references, rename_scoped_tree, rename_locals
+)
+
+def three_pass(ast):
+    ast = add_rename_scopes(ast)
+    ast = add_references(ast)
+    return rename_scoped_tree(ast)
+
+def measure(function, filename):
+    ast = parse_file(filename)
+    if tracemalloc is not None:
+        tracemalloc.start()
+    start = time.time()
+    result = function(ast)
+    elapsed = time.time() - start
+    peak = None
+    if tracemalloc is not None:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    elif resource is not None:
+        peak = get_max_rss()
+    return elapsed, peak, generate_string(result)
+
+def measure_in_process(function, filename):
+    """
+    Measure in a new process, so the peak resident set size is not left over
+    from parsing or renaming an earlier file.
+    """
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+    try:
+        return pool.apply(measure, (function, filename))
+    finally:
+        pool.close()
+        pool.join()
+
+def format_peak(peak):
+    if peak is None:
+        return 'n/a'
+    return '%.1f MB' % (peak / (1024.0 * 1024.0))
+
+def main(argv):
+    for filename in argv:
+        old_time, old_peak, expected = measure_in_process(
+            three_pass, filename
+        )
+        new_time, new_peak, output = measure_in_process(
+            rename_locals, filename
+        )
+        if output != expected:
+            sys.stderr.write('%s: output differs\n' % filename)
+            return 1
+        sys.stdout.write(
+            '%s: three pass %.3fs (%s), single pass %.3fs (%s)\n' % (
+                filename, old_time, format_peak(old_peak),
+                new_time, format_peak(new_peak)
+            )
+        )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,83 @@
+"""
+Compare the memory used per rename scope by the slotted ``RenameScope``
+against the former dictionary based scope.
+
+Usage::
+
+    python benchmarks/bench_scope_memory.py [SCOPES]
+"""
+import sys
+from collections import Counter, OrderedDict
+
+from jscompiler.rename import RenameScope
+
+
+class LegacyRenameScope(object):
+    """
+    The state of the former ``RenameScope``, kept as the comparison baseline.
+    """
+    def __init__(self, parent=None):
+        self.original_to_new = {}
+        self.new_to_original = {}
+        self.reference_counts = Counter()
+        self.references = {}
+        self._uses_eval = False
+        self.uses_with = False
+        self.parent = parent
+        self.declarations = OrderedDict()
+        self.function_declarations = OrderedDict()
+        self.parameter_declarations = OrderedDict()
+        self.variable_declarations = OrderedDict()
+
+    def populate(self, names):
+        for name in names:
+            self.parameter_declarations[name] = None
+            self.declarations[name] = None
+            self.references[name] = self
+
+def populate(scope, names):
+    for name in names:
+        scope.declare_parameter(name, None)
+        scope.references[name] = scope
+
+def scope_size(scope):
+    """
+    Sum the sizes of the scope object and the containers it owns.
+    """
+    size = sys.getsizeof(scope)
+    attributes = getattr(scope, '__dict__', None)
+    if attributes is not None:
+        size += sys.getsizeof(attributes)
+    else:
+        attributes = dict(
+            (name, getattr(scope, name))
+            for cls in type(scope).__mro__
+            for name in getattr(cls, '__slots__', ())
+        )
+    for value in attributes.values():
+        if isinstance(value, dict):
+            size += sys.getsizeof(value)
+    return size
+
+def main(argv):
+    count = int(argv[0]) if argv else 10000
+    names = [u'callback', u'index', u'value']
+    legacy_total = 0
+    compact_total = 0
+    legacy_parent = LegacyRenameScope()
+    compact_parent = RenameScope()
+    for i in range(count):
+        legacy = LegacyRenameScope(legacy_parent)
+        legacy.populate(names)
+        legacy_total += scope_size(legacy)
+        compact = RenameScope(compact_parent)
+        populate(compact, names)
+        compact_total += scope_size(compact)
+    sys.stdout.write(
+        'bytes per scope: legacy %d, slotted %d\n' % (
+            legacy_total // count, compact_total // count
+        )
+    )
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,201 @@
+/*
+ * A small event emitter with the helpers that usually come with one.
+ * Written for the benchmark corpus in the style of common browser libraries.
+ */
+(function (root, undefined) {
+    "use strict";
+
+    var slice = Array.prototype.slice,
+        hasOwnProperty = Object.prototype.hasOwnProperty,
+        toString = Object.prototype.toString,
+        nextId = 0;
+
+    function isFunction(value) {
+        return typeof value === "function";
+    }
+
+    function isArray(value) {
+        return toString.call(value) === "[object Array]";
+    }
+
+    function isObject(value) {
+        return value !== null && typeof value === "object";
+    }
+
+    function extend(target) {
+        var sources = slice.call(arguments, 1),
+            index, source, key;
+        for (index = 0; index < sources.length; index++) {
+            source = sources[index];
+            if (!isObject(source)) {
+                continue;
+            }
+            for (key in source) {
+                if (hasOwnProperty.call(source, key)) {
+                    target[key] = source[key];
+                }
+            }
+        }
+        return target;
+    }
+
+    function uniqueId(prefix) {
+        nextId += 1;
+        return (prefix || "id") + nextId;
+    }
+
+    function once(callback) {
+        var called = false, result;
+        return function () {
+            if (!called) {
+                called = true;
+                result = callback.apply(this, arguments);
+            }
+            return result;
+        };
+    }
+
+    function debounce(callback, wait, immediate) {
+        var timeout, context, args;
+        function later() {
+            timeout = null;
+            if (!immediate) {
+                callback.apply(context, args);
+            }
+        }
+        return function () {
+            var callNow = immediate && !timeout;
+            context = this;
+            args = arguments;
+            clearTimeout(timeout);
+            timeout = setTimeout(later, wait);
+            if (callNow) {
+                callback.apply(context, args);
+            }
+        };
+    }
+
+    function Emitter(options) {
+        this.id = uniqueId("emitter");
+        this.listeners = {};
+        this.options = extend({ maxListeners: 10, async: false }, options);
+    }
+
+    Emitter.prototype = {
+        constructor: Emitter,
+
+        on: function (name, callback, context) {
+            var listeners = this.listeners[name] || (this.listeners[name] = []);
+            if (!isFunction(callback)) {
+                throw new TypeError("Listener for " + name + " must be a function");
+            }
+            if (listeners.length >= this.options.maxListeners) {
+                if (typeof console !== "undefined" && console.warn) {
+                    console.warn("Possible listener leak on " + name + " (" +
+                                 listeners.length + " listeners)");
+                }
+            }
+            listeners.push({ callback: callback, context: context || this });
+            return this;
+        },
+
+        once: function (name, callback, context) {
+            var self = this,
+                wrapped = once(function () {
+                    self.off(name, wrapped);
+                    return callback.apply(this, arguments);
+                });
+            wrapped.original = callback;
+            return this.on(name, wrapped, context);
+        },
+
+        off: function (name, callback) {
+            var listeners, index, listener;
+            if (arguments.length === 0) {
+                this.listeners = {};
+                return this;
+            }
+            listeners = this.listeners[name];
+            if (!listeners) {
+                return this;
+            }
+            if (callback === undefined) {
+                delete this.listeners[name];
+                return this;
+            }
+            for (index = listeners.length - 1; index >= 0; index--) {
+                listener = listeners[index];
+                if (listener.callback === callback ||
+                        listener.callback.original === callback) {
+                    listeners.splice(index, 1);
+                }
+            }
+            return this;
+        },
+
+        emit: function (name) {
+            var listeners = this.listeners[name],
+                args = slice.call(arguments, 1),
+                self = this,
+                index, listener;
+            if (!listeners || !listeners.length) {
+                return false;
+            }
+            listeners = listeners.slice();
+            function dispatch() {
+                for (index = 0; index < listeners.length; index++) {
+                    listener = listeners[index];
+                    try {
+                        listener.callback.apply(listener.context, args);
+                    } catch (error) {
+                        if (name !== "error") {
+                            self.emit("error", error, name);
+                        } else {
+                            throw error;
+                        }
+                    }
+                }
+            }
+            if (this.options.async) {
+                setTimeout(dispatch, 0);
+            } else {
+                dispatch();
+            }
+            return true;
+        },
+
+        listenerCount: function (name) {
+            var listeners = this.listeners[name];
+            return listeners ? listeners.length : 0;
+        }
+    };
+
+    function mixin(target) {
+        var key;
+        for (key in Emitter.prototype) {
+            if (key !== "constructor") {
+                target[key] = Emitter.prototype[key];
+            }
+        }
+        Emitter.call(target);
+        return target;
+    }
+
+    var events = {
+        Emitter: Emitter,
+        mixin: mixin,
+        extend: extend,
+        once: once,
+        debounce: debounce,
+        uniqueId: uniqueId,
+        isArray: isArray,
+        isFunction: isFunction,
+        isObject: isObject
+    };
+
+    if (typeof module !== "undefined" && module.exports) {
+        module.exports = events;
+    } else {
+        root.events = events;
+    }
+})(this);
@@ -0,0 +1 @@
+(function(w,d){var r=/^#([\w-]+)$/,c=/^\.([\w-]+)$/,t=/^\w+$/,s=[].slice;function q(e,x){var m;x=x||d;if(typeof e!="string")return e&&e.nodeType?[e]:s.call(e||[]);if(m=r.exec(e)){m=d.getElementById(m[1]);return m?[m]:[]}if(m=c.exec(e))return s.call(x.getElementsByClassName(m[1]));if(t.test(e))return s.call(x.getElementsByTagName(e));return s.call(x.querySelectorAll(e))}function Q(e,x){if(!(this instanceof Q))return new Q(e,x);var n=q(e,x),i=0;for(;i<n.length;i++)this[i]=n[i];this.length=n.length}Q.prototype={each:function(f){for(var i=0;i<this.length;i++)if(f.call(this[i],this[i],i)===!1)break;return this},map:function(f){var o=[],i=0;for(;i<this.length;i++)o.push(f.call(this[i],this[i],i));return o},first:function(){return new Q(this[0])},addClass:function(n){return this.each(function(e){e.classList?e.classList.add(n):(" "+e.className+" ").indexOf(" "+n+" ")<0&&(e.className+=" "+n)})},removeClass:function(n){return this.each(function(e){e.classList?e.classList.remove(n):e.className=(" "+e.className+" ").replace(" "+n+" "," ").replace(/^\s+|\s+$/g,"")})},hasClass:function(n){var h=!1;this.each(function(e){if(e.classList?e.classList.contains(n):(" "+e.className+" ").indexOf(" "+n+" ")>=0)return h=!0,!1});return h},attr:function(k,v){if(v===void 0)return this.length?this[0].getAttribute(k):null;return this.each(function(e){v===null?e.removeAttribute(k):e.setAttribute(k,v)})},css:function(k,v){if(typeof k=="object"){for(var p in k)this.css(p,k[p]);return this}if(v===void 0)return this.length?w.getComputedStyle(this[0])[k]:void 0;return this.each(function(e){e.style[k]=typeof v=="number"&&!/opacity|z-?index/i.test(k)?v+"px":v})},on:function(n,f,o){return this.each(function(e){e.addEventListener(n,f,!!o)})},off:function(n,f,o){return this.each(function(e){e.removeEventListener(n,f,!!o)})},html:function(h){if(h===void 0)return this.length?this[0].innerHTML:"";return this.each(function(e){e.innerHTML=h})},text:function(x){if(x===void 0)return this.map(function(e){return e.textContent}).join("");return this.each(function(e){e.textContent=x})},find:function(e){var o=[];this.each(function(n){o=o.concat(q(e,n))});return new Q(o)},closest:function(e){var o=[];this.each(function(n){for(;n&&n!==d;n=n.parentNode)if(n.matches&&n.matches(e)){o.push(n);break}});return new Q(o)}};Q.ready=function(f){d.readyState!="loading"?setTimeout(f,0):d.addEventListener("DOMContentLoaded",f)};w.query=Q})(window,document);
@@ -0,0 +1,150 @@
+/*
+ * A tiny string template engine with escaping, loops and conditionals.
+ * Written for the benchmark corpus in the style of common browser libraries.
+ */
+var template = (function () {
+    var cache = {},
+        entities = {
+            "&": "&amp;",
+            "<": "&lt;",
+            ">": "&gt;",
+            '"': "&quot;",
+            "'": "&#39;",
+            "/": "&#x2F;"
+        },
+        escapePattern = /[&<>"'\/]/g,
+        tokenPattern = /\{\{\s*(#each|\/each|#if|\/if|else)?\s*([\w.]*)\s*\}\}/g,
+        whitespacePattern = /\s+/g;
+
+    function escapeHtml(value) {
+        if (value === null || value === undefined) {
+            return "";
+        }
+        return String(value).replace(escapePattern, function (character) {
+            return entities[character];
+        });
+    }
+
+    function lookup(context, path) {
+        var parts = path.split("."), index = 0, value = context;
+        if (path === "" || path === "this") {
+            return context;
+        }
+        while (value !== null && value !== undefined && index < parts.length) {
+            value = value[parts[index++]];
+        }
+        return value;
+    }
+
+    function tokenize(source) {
+        var tokens = [], last = 0, match;
+        tokenPattern.lastIndex = 0;
+        while ((match = tokenPattern.exec(source)) !== null) {
+            if (match.index > last) {
+                tokens.push({ type: "text", value: source.slice(last, match.index) });
+            }
+            tokens.push({
+                type: match[1] ? match[1].replace("#", "open-").replace("/", "close-") : "value",
+                value: match[2]
+            });
+            last = tokenPattern.lastIndex;
+        }
+        if (last < source.length) {
+            tokens.push({ type: "text", value: source.slice(last) });
+        }
+        return tokens;
+    }
+
+    function parse(tokens) {
+        var root = { type: "root", children: [] },
+            stack = [root],
+            index, token, node, top;
+        for (index = 0; index < tokens.length; index++) {
+            token = tokens[index];
+            top = stack[stack.length - 1];
+            switch (token.type) {
+            case "open-each":
+            case "open-if":
+                node = {
+                    type: token.type.slice(5),
+                    path: token.value,
+                    children: [],
+                    alternate: []
+                };
+                top.children.push(node);
+                stack.push(node);
+                break;
+            case "else":
+                if (top.type !== "if") {
+                    throw new Error("Unexpected else at token " + index);
+                }
+                top.children = top.alternate.concat(top.children);
+                top.alternate = top.children.splice(0, top.children.length);
+                break;
+            case "close-each":
+            case "close-if":
+                if (stack.length === 1) {
+                    throw new Error("Unbalanced block at token " + index);
+                }
+                stack.pop();
+                break;
+            default:
+                top.children.push(token);
+            }
+        }
+        if (stack.length !== 1) {
+            throw new Error("Unclosed block " + stack[stack.length - 1].type);
+        }
+        return root;
+    }
+
+    function render(node, context) {
+        var output = "", index, child, items, item, count;
+        for (index = 0; index < node.children.length; index++) {
+            child = node.children[index];
+            if (child.type === "text") {
+                output += child.value;
+            } else if (child.type === "value") {
+                output += escapeHtml(lookup(context, child.value));
+            } else if (child.type === "each") {
+                items = lookup(context, child.path) || [];
+                for (item = 0, count = items.length; item < count; item++) {
+                    output += render(child, items[item]);
+                }
+            } else if (child.type === "if") {
+                if (lookup(context, child.path)) {
+                    output += render(child, context);
+                } else if (child.alternate.length) {
+                    output += render({ children: child.alternate }, context);
+                }
+            }
+        }
+        return output;
+    }
+
+    function compile(source, options) {
+        var key = source, tree;
+        options = options || {};
+        if (options.collapseWhitespace) {
+            source = source.replace(whitespacePattern, " ");
+        }
+        if (!cache.hasOwnProperty(key)) {
+            cache[key] = parse(tokenize(source));
+        }
+        tree = cache[key];
+        return function (context) {
+            return render(tree, context === undefined ? {} : context);
+        };
+    }
+
+    return {
+        compile: compile,
+        escapeHtml: escapeHtml,
+        clearCache: function () {
+            cache = {};
+        },
+        render: function (source, context, options) {
+            return compile(source, options)(context);
+        }
+    };
+}());
@@ -0,0 +1,104 @@
+"""
+Deterministic generators of stress sources for the benchmark suite.
+
+Usage::
+
+    python benchmarks/stress.py DIRECTORY
+
+writes every generated source to the given directory.
+"""
+import os
+import sys
+
+
+def deep_nesting(depth=60):
+    """
+    Functions, blocks and parenthesized expressions nested ``depth`` deep.
+    """
+    parts = []
+    for level in range(depth):
+        parts.append(
+            u'function level%d(value%d) { if (value%d > %d) { var inner%d = '
+            u'(value%d + (%d * (value%d - 1))); ' % (
+                level, level, level, level, level, level, level, level
+            )
+        )
+    parts.append(u'return inner%d;' % (depth - 1))
+    for level in reversed(range(depth)):
+        parts.append(u' } return level%d; }' % level)
+    return u''.join(parts) + u'\n'
+
+def huge_object(entries=20000):
+    """
+    One object literal with ``entries`` properties of mixed value types.
+    """
+    lines = [u'var data = {']
+    for index in range(entries):
+        if index % 3 == 0:
+            value = u'%d' % index
+        elif index % 3 == 1:
+            value = u'"value %d"' % index
+        else:
+            value = u'[%d, "item%d", { nested: %d }]' % (index, index, index)
+        lines.append(u'    key%d: %s,' % (index, value))
+    lines.append(u'    last: null')
+    lines.append(u'};')
+    return u'\n'.join(lines) + u'\n'
+
+def closures(count=3000):
+    """
+    ``count`` functions each returning a closure over its own locals.
+    """
+    lines = [u'var handlers = [];']
+    for index in range(count):
+        lines.append(
+            u'handlers.push(function (event%d, options) { var counter = %d, '
+            u'total = 0; function step(amount) { counter += amount; '
+            u'return counter * options.scale; } return function () { '
+            u'total += step(event%d.delta); return total; }; });' % (
+                index, index, index
+            )
+        )
+    return u'\n'.join(lines) + u'\n'
+
+def string_concatenation(statements=500, terms=40):
+    """
+    ``statements`` assignments each concatenating ``terms`` strings and names.
+    """
+    lines = [u'var html = "", name = "name", title = "title";']
+    for index in range(statements):
+        terms_source = u' + '.join(
+            u'"<span class=\\"part%d\\">"' % term if term % 2 == 0 else
+            u'(term%d ? name : title)' % term
+            for term in range(terms)
+        )
+        lines.append(u'html += %s;' % terms_source)
+    return u'\n'.join(lines) + u'\n'
+
+GENERATORS = [
+    ('stress/deep_nesting.js', deep_nesting),
+    ('stress/huge_object.js', huge_object),
+    ('stress/closures.js', closures),
+    ('stress/string_concatenation.js', string_concatenation),
+]
+
+def generate_sources():
+    """
+    Generate every stress source, returning ``(name, bytes)`` pairs.
+    """
+    return [
+        (name, generator().encode('utf-8')) for name, generator in GENERATORS
+    ]
+
+def main(argv):
+    if not argv:
+        sys.stderr.write(__doc__)
+        return 1
+    for name, source in generate_sources():
+        path = os.path.join(argv[0], os.path.basename(name))
+        with open(path, 'wb') as fd:
+            fd.write(source)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,198 @@
+"""
+Run the benchmark suite over the bundled corpus and the generated stress
+sources, or compare the results of two runs.
+
+Usage::
+
+    python benchmarks/suite.py run [-o RESULTS] [-n REPEAT] [FILENAME ...]
+    python benchmarks/suite.py compare [-t THRESHOLD] OLD NEW
+
+``run`` measures the parse, rename and generate throughput in MB/s and the
+peak memory of every phase, writing JSON results. Memory is measured in a
+fresh worker process for each source, as the peak traced memory of each
+phase with ``tracemalloc`` or otherwise as the peak resident set size of the
+worker by the end of the phase. ``compare`` lists
+the changes between two result files and exits with a non-zero status if any
+phase got slower or used more memory than the threshold allows.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import sys
+
+from jscompiler import __version__
+from jscompiler.profiling import Profiler, compile_profiled
+from jscompiler.locator_parser import NO_LOCATIONS
+
+import stress
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+# Profiler phases reported under each suite phase
+PHASES = (
+    ('parse', ('parse',)),
+    ('rename', ('analyze', 'rename')),
+    ('generate', ('generate',)),
+)
+
+def load_corpus(filenames=None):
+    """
+    Get ``(name, bytes)`` pairs for the given files, or for the bundled
+    corpus and the generated stress sources.
+    """
+    if filenames:
+        paths = filenames
+        generated = []
+    else:
+        paths = sorted(glob.glob(os.path.join(CORPUS_DIR, '*.js')))
+        generated = stress.generate_sources()
+    sources = []
+    for path in paths:
+        with open(path, 'rb') as fd:
+            sources.append((os.path.basename(path), fd.read()))
+    return sources + generated
+
+def profile_phases(source, name, trace_memory):
+    profiler = Profiler(trace_memory=trace_memory)
+    compile_profiled(source, profiler, name, True, NO_LOCATIONS)
+    phases = {}
+    for stats in profiler.phases:
+        phases[stats.name] = stats
+    return phases
+
+def memory_phases(source, name):
+    phases = profile_phases(source, name, True)
+    memory = {}
+    for key, stats in phases.items():
+        if stats.peak_memory is not None:
+            memory[key] = stats.peak_memory
+        else:
+            memory[key] = stats.peak_rss
+    return memory
+
+def measure_memory(name, source):
+    """
+    Get the peak memory of each profiler phase from one run in a new process,
+    so the peak resident set size is not left over from earlier sources.
+    """
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+    try:
+        return pool.apply(memory_phases, (source, name))
+    finally:
+        pool.close()
+        pool.join()
+
+def measure(name, source, repeat):
+    """
+    Take the best time of each phase over ``repeat`` unmeasured runs, and the
+    peak memory of each phase from one measured run.
+    """
+    best = {}
+    for i in range(repeat):
+        phases = profile_phases(source, name, False)
+        for phase, names in PHASES:
+            elapsed = sum(phases[key].wall_time for key in names)
+            if phase not in best or elapsed < best[phase]:
+                best[phase] = elapsed
+    memory = measure_memory(name, source)
+    megabytes = len(source) / (1024.0 * 1024.0)
+    results = {}
+    for phase, names in PHASES:
+        peaks = [memory[key] for key in names]
+        seconds = max(best[phase], 1e-9)
+        results[phase] = {
+            'seconds': seconds,
+            'mb_per_s': megabytes / seconds,
+            'peak_memory': None if None in peaks else max(peaks),
+        }
+    return {'bytes': len(source), 'phases': results}
+
+def run(options):
+    results = {}
+    for name, source in load_corpus(options.filenames):
+        results[name] = measure(name, source, options.repeat)
+        phases = results[name]['phases']
+        sys.stderr.write(
+            '%-32s parse %7.2f  rename %7.2f  generate %7.2f MB/s\n' % (
+                name, phases['parse']['mb_per_s'],
+                phases['rename']['mb_per_s'], phases['generate']['mb_per_s']
+            )
+        )
+    document = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(options.output, 'wb') as fd:
+        json.dump(document, fd, indent=2, sort_keys=True)
+        fd.write('\n')
+    return 0
+
+def compare(options):
+    with open(options.old, 'rb') as fd:
+        old = json.load(fd)['results']
+    with open(options.new, 'rb') as fd:
+        new = json.load(fd)['results']
+    regressions = 0
+    for name in sorted(set(old) & set(new)):
+        for phase, names in PHASES:
+            before = old[name]['phases'][phase]
+            after = new[name]['phases'][phase]
+            speed = after['mb_per_s'] / before['mb_per_s'] - 1.0
+            flags = []
+            if speed < -options.threshold:
+                flags.append('SLOWER')
+            memory = ''
+            if before['peak_memory'] and after['peak_memory'] is not None:
+                growth = after['peak_memory'] / float(before['peak_memory'])
+                growth -= 1.0
+                memory = '%+6.1f%% memory' % (growth * 100)
+                if growth > options.threshold:
+                    flags.append('MORE MEMORY')
+            regressions += len(flags)
+            sys.stdout.write(
+                '%-32s %-8s %+6.1f%% MB/s %s %s\n' % (
+                    name, phase, speed * 100, memory, ' '.join(flags)
+                )
+            )
+    for name in sorted(set(old) ^ set(new)):
+        sys.stdout.write('%-32s only in one run\n' % name)
+    sys.stdout.write('%d regressions\n' % regressions)
+    return regressions and 1 or 0
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='suite')
+    commands = parser.add_subparsers()
+    run_parser = commands.add_parser('run', help='Run the benchmarks.')
+    run_parser.add_argument(
+        '-o', '--output', default='results.json', metavar='FILENAME',
+        help='The JSON file to write results to. Defaults to results.json.'
+    )
+    run_parser.add_argument(
+        '-n', '--repeat', type=int, default=3, metavar='COUNT',
+        help='Take the best of this many runs. Defaults to 3.'
+    )
+    run_parser.add_argument(
+        'filenames', metavar='FILENAME', nargs='*',
+        help='Benchmark these files instead of the bundled corpus.'
+    )
+    run_parser.set_defaults(command=run)
+    compare_parser = commands.add_parser(
+        'compare', help='Compare the results of two runs.'
+    )
+    compare_parser.add_argument(
+        '-t', '--threshold', type=float, default=0.05,
+        help='The relative change counted as a regression. Defaults to 0.05.'
+    )
+    compare_parser.add_argument('old', metavar='OLD')
+    compare_parser.add_argument('new', metavar='NEW')
+    compare_parser.set_defaults(command=compare)
+    options = parser.parse_args(argv)
+    return options.command(options)
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -21,63 +21,229 @@ def process_args(argv=None):
         '-r', '--rename-locals', action='store_true', dest='rename',
         help='Rename local variables to shorter names when possible.'
     )
+    parser.add_argument(
+        '-f', '--fold-constants', action='store_true', dest='fold',
+        help='Replace operations on constants with their values when shorter.'
+    )
+    parser.add_argument(
+        '--compact-locations', action='store_const', dest='locations',
+        const='compact', default='full',
+        help='Store compact integer positions on nodes instead of locators.'
+    )
+    parser.add_argument(
+        '--no-locations', action='store_const', dest='locations',
+        const='none',
+        help='Do not record source locations on nodes.'
+    )
+    parser.add_argument(
+        '--stream', action='store_true', dest='stream',
+        help='Minify one top-level statement at a time to bound memory use. '
+             'Renaming cannot see later statements in this mode.'
+    )
+    parser.add_argument(
+        '--cache-dir', dest='cache_dir', metavar='DIRECTORY',
+        help='Cache parsed trees and output in the given directory.'
+    )
+    parser.add_argument(
+        '--cache-size', type=int, dest='cache_size', default=256,
+        metavar='MEGABYTES',
+        help='The maximum size of the cache directory. Defaults to 256.'
+    )
     parser.add_argument(
         '-o', '--output', type=argparse.FileType('wb'), dest='output',
         default=sys.stdout, metavar='FILENAME',
         help='The file to write the output to. Defaults to stdout.'
     )
     parser.add_argument(
-        'input', metavar='FILENAME', type=argparse.FileType('rb'), nargs=1,
-        help='The file to minify.'
+        '-d', '--output-dir', dest='output_dir', metavar='DIRECTORY',
+        help='Minify every input into the given directory in parallel.'
+    )
+    parser.add_argument(
+        '--manifest', dest='manifest', metavar='FILENAME',
+        help='A file listing further inputs or patterns, one per line.'
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, dest='jobs', metavar='COUNT',
+        help='The number of worker processes. Defaults to the core count.'
+    )
+    parser.add_argument(
+        '--serve', dest='serve', metavar='SOCKET',
+        help='Serve compile requests on the given Unix socket.'
+    )
+    parser.add_argument(
+        '--connect', dest='connect', metavar='SOCKET',
+        help='Compile through the server listening on the given Unix socket.'
+    )
+    parser.add_argument(
+        '--watch', dest='watch', metavar='DIRECTORY',
+        help='Keep recompiling changed files in the given directory into the '
+             'output directory.'
+    )
+    parser.add_argument(
+        '--profile', action='store_true', dest='profile',
+        help='Print the time, memory and node count of each phase to stderr.'
+    )
+    parser.add_argument(
+        '--profile-json', dest='profile_json', metavar='FILENAME',
+        help='Write the measurements of each phase to the given JSON file.'
+    )
+    parser.add_argument(
+        '--visit-stats', action='store_true', dest='visit_stats',
+        help='Print visit counts and times per node class and token counts '
+             'per token type to stderr.'
+    )
+    parser.add_argument(
+        '--size-report', action='store_true', dest='size_report',
+        help='Print the output size after each pass and per function to '
+             'stderr.'
+    )
+    parser.add_argument(
+        'input', metavar='FILENAME', nargs='*',
+        help='The files or glob patterns to minify.'
     )
     if argv:
         options = parser.parse_args(argv)
     else:
         options = parser.parse_args()
+    if options.watch is not None and options.output_dir is None:
+        parser.error('--watch requires --output-dir')
+    if options.output_dir is None and options.serve is None:
+        if options.manifest is not None or len(options.input) != 1:
+            parser.error('exactly one input is required without --output-dir')
+        try:
+            options.input = [argparse.FileType('rb')(options.input[0])]
+        except argparse.ArgumentTypeError, e:
+            parser.error(str(e))
     return options
 
 
-def write_ast(ast, outfile):
+def parse_tree(parser, scoped=False):
     """
-    Write an abstract syntax tree to a file.
+    Run the given parser. If ``scoped`` is true the tree is analyzed for
+    renaming and a ``RenameAnalysis`` is returned instead.
     """
-    from .code_consumer import make_print_consumer
-    from .code_generator import generate_code
-    consumer = make_print_consumer(outfile)
-    generate_code(ast, consumer)
+    ast = parser.parse()
+    if scoped:
+        from .rename import analyze_scopes
+        ast = analyze_scopes(ast)
+    return ast
 
 
-def parse_input(input):
+def parse_input(input, locations='full', cache=None, scoped=False):
     """
     Parse the file from the given input file object and return an abstract
-    syntax tree.
+    syntax tree. ``locations`` is one of ``'full'``, ``'compact'`` or
+    ``'none'``. If ``scoped`` is true a ``RenameAnalysis`` of the tree is
+    returned, ready for ``rename_ast``. Trees are loaded from and stored to
+    the given ``TreeCache`` if there is one.
+    """
+    from .locator_parser import make_file_parser, read_source
+    filename = getattr(input, 'name', None)
+    if cache is None:
+        parser = make_file_parser(input, filename, locations=locations)
+        return parse_tree(parser, scoped)
+    source = read_source(input)
+    return parse_source(source, filename, locations, cache, scoped)
+
+
+def parse_source(source, filename=None, locations='full', cache=None,
+                 scoped=False):
     """
-    from .locator_parser import make_file_parser
-    parser = make_file_parser(input)
-    return parser.parse()
+    Parse encoded source bytes and return an abstract syntax tree, as
+    ``parse_input`` does for file objects.
+    """
+    from .locator_parser import make_string_parser
+    if cache is not None:
+        kind = u'%s-%s' % (scoped and u'scoped' or u'ast', locations)
+        ast = cache.load(source, kind)
+        if ast is not None:
+            return ast
+    parser = make_string_parser(source, filename, locations=locations)
+    ast = parse_tree(parser, scoped)
+    if cache is not None:
+        cache.store(source, ast, kind)
+    return ast
+
+
+def rename_ast(ast, scoped=False, stats=None):
+    """
+    Rename locals in the AST, returning an AST object. If ``scoped`` is true
+    a ``RenameAnalysis`` is given instead of an AST. Visits are counted in
+    the given ``VisitStats`` object if there is one.
+    """
+    from .rename import rename_locals, rename_analyzed_tree
+    if scoped:
+        return rename_analyzed_tree(ast)
+    return rename_locals(ast, stats)
+
+
+def write_ast(ast, outfile, encoding='utf-8', stats=None):
+    """
+    Write the optimized AST to the given file object, counting visits and
+    tokens in the given ``VisitStats`` object if there is one.
+    """
+    from .code_generator import generate_string
+    outfile.write(generate_string(ast, stats).encode(encoding))
 
 
-def rename_ast(ast):
+def minify(source, filename=None, rename=False, locations='full',
+           tree_cache=None, output_cache=None, fold=False):
     """
-    Rename locals in the AST, returning an AST object.
+    Minify encoded source bytes, returning the UTF-8 encoded output. With an
+    ``OutputCache`` unchanged sources are returned without being parsed.
+    Constants are folded before renaming if ``fold`` is true.
     """
-    from .rename import rename_locals
-    return rename_locals(ast)
+    from .code_generator import generate_string
+    settings = {u'rename': rename}
+    if fold:
+        settings[u'fold'] = True
+    if output_cache is not None:
+        output = output_cache.load(source, settings)
+        if output is not None:
+            return output
+    if fold:
+        from .fold import fold_constants
+        ast = parse_source(source, filename, locations, tree_cache)
+        ast = fold_constants(ast)
+        if rename:
+            ast = rename_ast(ast)
+    else:
+        ast = parse_source(source, filename, locations, tree_cache, rename)
+        if rename:
+            ast = rename_ast(ast, scoped=True)
+    output = generate_string(ast).encode('utf-8')
+    if output_cache is not None:
+        output_cache.store(source, settings, output)
+    return output
 
 
-def write_ast(ast, outfile):
+def stream_input(input, outfile, rename=False, locations='full', fold=False):
     """
-    Write the optimized AST to the given file object.
+    Minify the given input file object one top-level statement at a time,
+    writing each to the given output file object as soon as it is generated.
+    Only the tree of the current statement is held in memory. Renaming sees
+    one statement at a time, as described for ``rename_statements``.
     """
     from .code_consumer import make_print_consumer
-    from .code_generator import generate_code
+    from .code_generator import generate_code_stream
+    from .locator_parser import make_file_parser, iter_source_elements
+    filename = getattr(input, 'name', None)
+    parser = make_file_parser(input, filename, locations=locations)
+    statements = iter_source_elements(parser)
+    if fold:
+        from itertools import imap
+        from .fold import fold_constants
+        statements = imap(fold_constants, statements)
+    if rename:
+        from .rename import rename_statements
+        statements = rename_statements(statements)
     consumer = make_print_consumer(outfile)
-    generate_code(ast, consumer)
+    generate_code_stream(statements, consumer)
 
 
 def main(argv=None):
     """
-    Minify a file.
+    Minify a file, or many files into an output directory.
     """
     import sys
     from bigrig.parser import ParseException
@@ -85,11 +251,100 @@ def main(argv=None):
         options = process_args(argv)
     except Exception, e:
         return 1
+    settings = {
+        'rename': options.rename,
+        'fold': options.fold,
+        'locations': options.locations,
+        'cache_dir': options.cache_dir,
+        'cache_size': options.cache_size,
+    }
     try:
-        ast = parse_input(options.input[0])
+        if options.cache_dir:
+            from .cache import check_cache_directory
+            try:
+                check_cache_directory(options.cache_dir)
+            except ValueError, e:
+                sys.stderr.write('%s\n' % e)
+                return 1
+        if options.serve is not None:
+            from .server import serve
+            return serve(options.serve, settings, options.jobs)
+        if options.connect is not None:
+            from .server import run_remote
+            return run_remote(options.connect, options)
+        if options.watch is not None:
+            from .watch import watch
+            watch(
+                options.watch, options.output_dir, options.rename,
+                options.locations, options.fold
+            )
+            return 0
+        if options.output_dir is not None:
+            from .batch import compile_batch, expand_inputs
+            paths = expand_inputs(options.input, options.manifest)
+            failures = compile_batch(
+                paths, options.output_dir, settings, options.jobs
+            )
+            return failures and 1 or 0
+        if options.profile or options.profile_json:
+            from .locator_parser import read_source
+            from .profiling import Profiler, compile_profiled
+            input = options.input[0]
+            profiler = Profiler()
+            output = compile_profiled(
+                read_source(input), profiler, getattr(input, 'name', None),
+                options.rename, options.locations, options.fold
+            )
+            options.output.write(output)
+            if options.profile:
+                profiler.write_table(sys.stderr)
+            if options.profile_json:
+                with open(options.profile_json, 'wb') as fd:
+                    profiler.write_json(fd)
+            return 0
+        if options.size_report:
+            from .locator_parser import read_source
+            from .size_report import get_passes, report_sizes
+            input = options.input[0]
+            output, report = report_sizes(
+                read_source(input), getattr(input, 'name', None),
+                get_passes(options.rename, options.fold), options.locations
+            )
+            options.output.write(output)
+            report.write_table(sys.stderr)
+            return 0
+        if options.stream:
+            stream_input(
+                options.input[0], options.output, options.rename,
+                options.locations, options.fold
+            )
+            return 0
+        if options.cache_dir:
+            from .cache import OutputCache, TreeCache
+            from .locator_parser import read_source
+            input = options.input[0]
+            max_size = options.cache_size * 1024 * 1024
+            output = minify(
+                read_source(input), getattr(input, 'name', None),
+                options.rename, options.locations,
+                TreeCache(options.cache_dir, max_size),
+                OutputCache(options.cache_dir, max_size), options.fold
+            )
+            options.output.write(output)
+            return 0
+        stats = None
+        if options.visit_stats:
+            from .stats import VisitStats
+            stats = VisitStats()
+        ast = parse_input(options.input[0], options.locations)
+        if options.fold:
+            from .fold import fold_constants
+            ast = fold_constants(ast)
         if options.rename:
-            ast = rename_ast(ast)
-        write_ast(ast, options.output)
+            ast = rename_ast(ast, stats=stats)
+        write_ast(ast, options.output, stats=stats)
+        if stats is not None:
+            stats.write_table(sys.stderr)
     except ParseException, e:
         sys.stderr.write(str(e))
         return 1
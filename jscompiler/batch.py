@@ -0,0 +1,175 @@
+"""
+Compile many files at once across a pool of worker processes.
+"""
+import errno
+import glob
+import os
+import sys
+import time
+
+# Per process compile settings and caches, set up by ``initialize_worker``
+worker_settings = None
+worker_caches = (None, None)
+
+def expand_inputs(patterns, manifest=None):
+    """
+    Build the list of input paths from glob patterns and an optional manifest
+    file listing one path or pattern per line. Patterns matching nothing are
+    kept as is, so the missing file is reported like any other error. Paths
+    naming the same file are only kept the first time they appear.
+    """
+    patterns = list(patterns)
+    if manifest is not None:
+        with open(manifest, 'rb') as fd:
+            for line in fd:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    patterns.append(line)
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            normalized = os.path.abspath(path)
+            if normalized not in seen:
+                seen.add(normalized)
+                paths.append(path)
+    return paths
+
+def get_common_directory(directories):
+    """
+    Get the deepest directory containing all of the given absolute
+    directories, comparing whole path components.
+    """
+    common = None
+    for directory in directories:
+        components = directory.split(os.sep)
+        if common is None:
+            common = components
+            continue
+        length = 0
+        for a, b in zip(common, components):
+            if a != b:
+                break
+            length += 1
+        common = common[:length]
+    return os.sep.join(common or []) or os.sep
+
+def get_output_paths(paths, output_dir):
+    """
+    Map input paths to output paths, keeping their layout relative to the
+    deepest directory containing all of them. Raises ``ValueError`` if an
+    output path would fall outside of the output directory.
+    """
+    paths = [os.path.abspath(path) for path in paths]
+    base = get_common_directory([os.path.dirname(path) for path in paths])
+    root = os.path.join(os.path.abspath(output_dir), '')
+    output_paths = []
+    for path in paths:
+        relative = os.path.relpath(path, base)
+        output_path = os.path.normpath(os.path.join(root, relative))
+        if not output_path.startswith(root):
+            raise ValueError(
+                '%s would be written outside of %s' % (path, output_dir)
+            )
+        output_paths.append(os.path.join(output_dir, relative))
+    return output_paths
+
+def initialize_worker(settings):
+    """
+    Set up the settings and caches used by every task run in this process.
+    """
+    global worker_settings, worker_caches
+    worker_settings = settings
+    worker_caches = (None, None)
+    if settings.get('cache_dir'):
+        from .cache import OutputCache, TreeCache
+        max_size = settings['cache_size'] * 1024 * 1024
+        worker_caches = (
+            TreeCache(settings['cache_dir'], max_size),
+            OutputCache(settings['cache_dir'], max_size),
+        )
+
+def write_output(path, output):
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory)
+    except OSError, e:
+        if e.errno != errno.EEXIST:
+            raise
+    with open(path, 'wb') as fd:
+        fd.write(output)
+
+def compile_task(task):
+    """
+    Compile one input path to one output path, returning the input path, the
+    number of bytes read and an error message or ``None``.
+    """
+    from bigrig.parser import ParseException
+    from . import minify
+    from .locator_parser import read_source
+    path, output_path = task
+    tree_cache, output_cache = worker_caches
+    size = 0
+    try:
+        with open(path, 'rb') as fd:
+            source = read_source(fd)
+        size = len(source)
+        output = minify(
+            source, path, worker_settings['rename'],
+            worker_settings['locations'], tree_cache, output_cache,
+            worker_settings.get('fold', False)
+        )
+        write_output(output_path, output)
+    except ParseException, e:
+        return path, size, str(e)
+    except EnvironmentError, e:
+        return path, size, str(e)
+    except Exception, e:
+        return path, size, '%s: %s' % (e.__class__.__name__, e)
+    return path, size, None
+
+def compile_batch(paths, output_dir, settings, jobs=None, errors=sys.stderr):
+    """
+    Compile every input path into the output directory using ``jobs`` worker
+    processes, one per core by default. Errors are reported per file and a
+    throughput summary is written at the end. Returns the number of files
+    that failed.
+    """
+    import multiprocessing
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+    try:
+        tasks = zip(paths, get_output_paths(paths, output_dir))
+    except ValueError, e:
+        errors.write('%s\n' % e)
+        return len(paths)
+    start = time.time()
+    if jobs == 1:
+        initialize_worker(settings)
+        results = map(compile_task, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(jobs, initialize_worker, (settings,))
+        results = pool.imap_unordered(compile_task, tasks)
+    failures = 0
+    total_size = 0
+    try:
+        for path, size, error in results:
+            total_size += size
+            if error is not None:
+                failures += 1
+                errors.write('%s: %s\n' % (path, error))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    elapsed = max(time.time() - start, 1e-6)
+    megabytes = total_size / (1024.0 * 1024.0)
+    errors.write(
+        'Compiled %d files (%d failed), %.2f MB in %.2fs (%.2f MB/s, '
+        '%.1f files/s) with %d workers\n' % (
+            len(paths), failures, megabytes, elapsed, megabytes / elapsed,
+            len(paths) / elapsed, jobs
+        )
+    )
+    return failures
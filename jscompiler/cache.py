@@ -0,0 +1,250 @@
+"""
+Persistent, content addressed caches for compilation artifacts.
+
+Cached trees are pickles, and loading a pickle can run arbitrary code, so a
+cache directory must only be writable by the user running the compiler.
+``check_cache_directory`` creates it private and refuses directories owned
+by someone else or writable by group or others.
+"""
+import errno
+import hashlib
+import os
+import stat
+import tempfile
+import time
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from . import __version__
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# The layout of cached entries. Bump this whenever the pickled trees or the
+# output for the same settings change, so entries from older builds miss.
+CACHE_FORMAT = 1
+
+# The fraction of the size limit a process writes between eviction scans
+EVICT_FRACTION = 16
+
+# The seconds between eviction scans started by new processes
+EVICT_INTERVAL = 60
+
+# Touched after every eviction scan of a directory
+EVICT_MARKER = '.evicted'
+
+def check_cache_directory(directory):
+    """
+    Create the cache directory readable and writable by its owner only, or
+    check that an existing one is owned by the current user and not writable
+    by anyone else. Raises ``ValueError`` if it is not.
+    """
+    try:
+        os.makedirs(directory, 0700)
+    except OSError, e:
+        if e.errno != errno.EEXIST:
+            raise
+    info = os.stat(directory)
+    if info.st_uid != os.getuid():
+        raise ValueError(
+            'cache directory %s is owned by another user' % directory
+        )
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise ValueError(
+            'cache directory %s is writable by other users' % directory
+        )
+
+def hash_source(source, *parts):
+    """
+    Build a cache key from the source bytes, the compiler version, the cache
+    format and any extra string parts.
+    """
+    digest = hashlib.sha1()
+    digest.update(source)
+    for part in (__version__, unicode(CACHE_FORMAT)) + parts:
+        digest.update(b'\0')
+        digest.update(part.encode('utf-8'))
+    return digest.hexdigest()
+
+class FileCache(object):
+    """
+    A directory of entries named by key with a bounded total size. Reads touch
+    entries, so evicting the oldest modification times first gives least
+    recently used eviction. Any number of processes may share a directory:
+    entries are replaced atomically and entries vanishing under a reader are
+    treated as misses.
+
+    The directory is scanned for eviction on the first store of a process if
+    no process has scanned it for ``EVICT_INTERVAL`` seconds, which keeps
+    short lived processes bounded, and again whenever a process has written a
+    sixteenth of the size limit since its last scan.
+    """
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.written = 0
+        self.checked_marker = False
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """
+        Get the bytes stored under the key, or ``None`` on a miss.
+        """
+        path = self.get_path(key)
+        try:
+            with open(path, 'rb') as fd:
+                data = fd.read()
+        except EnvironmentError:
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            # Evicted by another process since we opened it
+            pass
+        return data
+
+    def set(self, key, data):
+        """
+        Store bytes under the key. The entry is written to a temporary file and
+        renamed into place so readers never see a partial entry.
+        """
+        path = self.get_path(key)
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory)
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                raise
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                temp.write(data)
+            os.rename(temp_path, path)
+        except:
+            os.remove(temp_path)
+            raise
+        self.written += len(data)
+        if self.written > self.max_size // EVICT_FRACTION or\
+                self.eviction_due():
+            self.evict()
+
+    def eviction_due(self):
+        """
+        Check once per process whether the last eviction scan of the
+        directory by any process is more than ``EVICT_INTERVAL`` seconds old.
+        """
+        if self.checked_marker:
+            return False
+        self.checked_marker = True
+        marker = os.path.join(self.directory, EVICT_MARKER)
+        try:
+            last = os.stat(marker).st_mtime
+        except OSError:
+            return True
+        return time.time() - last >= EVICT_INTERVAL
+
+    def iter_entries(self):
+        """
+        Yield ``(modification time, size, path)`` for every stored entry.
+        """
+        for root, directories, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.startswith('.'):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                yield info.st_mtime, info.st_size, path
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits its size
+        limit.
+        """
+        self.written = 0
+        self.checked_marker = True
+        entries = sorted(self.iter_entries())
+        size = sum(entry[1] for entry in entries)
+        for mtime, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+        marker = os.path.join(self.directory, EVICT_MARKER)
+        try:
+            with open(marker, 'ab'):
+                pass
+            os.utime(marker, None)
+        except EnvironmentError:
+            pass
+
+class TreeCache(object):
+    """
+    Caches parsed abstract syntax trees keyed by the source bytes they were
+    parsed from. Locators in a cached tree name the file that stored it. The
+    directory is checked with ``check_cache_directory``, as trees are
+    unpickled from it.
+    """
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        check_cache_directory(directory)
+        self.files = FileCache(directory, max_size)
+
+    def get_key(self, source, kind):
+        return hash_source(source, u'tree', kind)
+
+    def load(self, source, kind=u'ast'):
+        """
+        Load the tree of the given kind for the source, or ``None`` on a miss.
+        """
+        data = self.files.get(self.get_key(source, kind))
+        if data is None:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception:
+            return None
+
+    def store(self, source, tree, kind=u'ast'):
+        """
+        Store a tree of the given kind for the source. Trees too deep to
+        serialize are silently not cached.
+        """
+        try:
+            data = pickle.dumps(tree, pickle.HIGHEST_PROTOCOL)
+        except (RuntimeError, pickle.PicklingError):
+            return
+        self.files.set(self.get_key(source, kind), data)
+
+class OutputCache(object):
+    """
+    Caches compiled output keyed by the source bytes and the settings that
+    affect the output.
+    """
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.files = FileCache(directory, max_size)
+
+    def get_key(self, source, settings):
+        parts = [u'%s=%r' % item for item in sorted(settings.items())]
+        return hash_source(source, u'output', *parts)
+
+    def load(self, source, settings):
+        """
+        Load the output compiled from the source with the given settings, or
+        ``None`` on a miss.
+        """
+        return self.files.get(self.get_key(source, settings))
+
+    def store(self, source, settings, output):
+        """
+        Store the output compiled from the source with the given settings.
+        """
+        self.files.set(self.get_key(source, settings), output)
@@ -3,6 +3,10 @@ Classes for consuming token events from code generators.
 """
 from bigrig import token as t
 
+from .tokens import get_shared_token
+
+DEFAULT_FLUSH_THRESHOLD = 8192
+
 LITERALS = frozenset((
     t.RETURN,
     t.NEW,
@@ -36,6 +40,8 @@ LITERALS = frozenset((
     t.IDENTIFIER,
 ))
 
+SPACE_TOKEN = get_shared_token(t.SPACE, u' ')
+
 class BaseConsumer(object):
     """
     A base class for all consumer classes that simply passes all reported
@@ -87,7 +93,7 @@ class MinifiedPrintConsumer(BaseConsumer):
         self.stream.write(token.value)
 
     def report_space(self):
-        self.report_token(t.Token(t.SPACE, u' '))
+        self.report_token(SPACE_TOKEN)
 
     def report_number(self, token):
         if self.last_token and self.last_token.type in LITERALS:
@@ -117,14 +123,40 @@ class MinifiedPrintConsumer(BaseConsumer):
             self.report_space()
         self.report_token(token)
 
-def make_print_consumer(stream, encoding='utf-8'):
+class BufferedPrintConsumer(MinifiedPrintConsumer):
+    """
+    A print consumer that collects token values and writes them to a byte
+    stream encoded in large blocks. The buffer is flushed once it holds
+    ``flush_threshold`` tokens and when the end of input is reported.
+    """
+    def __init__(self, stream, encoding='utf-8',
+                 flush_threshold=DEFAULT_FLUSH_THRESHOLD):
+        super(BufferedPrintConsumer, self).__init__(stream)
+        self.encoding = encoding
+        self.flush_threshold = flush_threshold
+        self.buffer = []
+
+    def report_token(self, token):
+        self.last_token = token
+        buffer = self.buffer
+        buffer.append(token.value)
+        if len(buffer) >= self.flush_threshold or token.type == t.EOF:
+            self.flush()
+
+    def flush(self):
+        """
+        Encode and write all buffered token values.
+        """
+        if self.buffer:
+            self.stream.write(u''.join(self.buffer).encode(self.encoding))
+            del self.buffer[:]
+
+def make_print_consumer(stream, encoding='utf-8',
+                        flush_threshold=DEFAULT_FLUSH_THRESHOLD):
     """
     Build a print consumer object for the given stream.
     """
-    from codecs import getwriter
-    StreamWriter = getwriter(encoding)
-    writer = StreamWriter(stream)
-    return MinifiedPrintConsumer(writer)
+    return BufferedPrintConsumer(stream, encoding, flush_threshold)
 
 def print_string(ast, encoding='utf-8'):
     """
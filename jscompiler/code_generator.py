@@ -5,9 +5,11 @@ consumer.
 """
 from bigrig import ast
 from bigrig import token as t
-from bigrig.visitor import NodeVisitor
 
+from .code_consumer import LITERALS
 from .precedence import precedence as get_precedence
+from .tokens import build_token_table
+from .visitor import NodeVisitor
 
 NEEDS_SEMICOLON = (
     ast.DoWhileStatement,
@@ -76,6 +78,24 @@ UNARY_OP_TO_TYPE = {
     u'!': t.NOT,
 }
 
+LITERAL_TOKENS = build_token_table(t.LITERAL_TO_TYPE)
+KEYWORD_TOKENS = build_token_table(t.KEYWORD_TO_TYPE)
+BINARY_OP_TOKENS = build_token_table(BINARY_OP_TO_TYPE)
+UNARY_OP_TOKENS = build_token_table(UNARY_OP_TO_TYPE)
+
+# Expression nodes whose output starts with a leftmost operand, mapped to the
+# operand attribute and the method reporting the rest of the node
+LEFT_OPERANDS = {
+    ast.Assignment: ('target', 'finish_Assignment'),
+    ast.BinaryOperation: ('left', 'finish_BinaryOperation'),
+    ast.BracketProperty: ('object', 'finish_BracketProperty'),
+    ast.CallExpression: ('expression', 'finish_CallExpression'),
+    ast.CompareOperation: ('left', 'finish_CompareOperation'),
+    ast.Conditional: ('condition', 'finish_Conditional'),
+    ast.DotProperty: ('object', 'finish_DotProperty'),
+    ast.PostfixCountOperation: ('expression', 'finish_PostfixCountOperation'),
+}
+
 class CodeGenerator(NodeVisitor):
     """
     Generates the minimal sequence of tokens that could result in
@@ -84,6 +104,9 @@ class CodeGenerator(NodeVisitor):
     def __init__(self, consumer=None):
         self.consumer = consumer
         self.marked_for_parens = set()
+        # id of node -> (node, precedence), holding the node so its id cannot
+        # be reused while the entry exists
+        self.precedences = {}
         super(CodeGenerator, self).__init__()
 
     def generate(self, ast):
@@ -91,6 +114,22 @@ class CodeGenerator(NodeVisitor):
         The main entrypoint for walking a tree.
         """
         self.visit(ast)
+        self.precedences.clear()
+        self.report_token(t.EOF, u'')
+
+    def generate_statements(self, statements):
+        """
+        Walk an iterable of top-level statements, reporting the tokens of each
+        as soon as it is consumed. Separating semicolons are reported exactly
+        as ``visit_statement_list`` would for the whole program.
+        """
+        needs_semicolon = False
+        for statement in statements:
+            if needs_semicolon:
+                self.report_literal(u';')
+            self.visit(statement)
+            self.precedences.clear()
+            needs_semicolon = self.needs_semicolon(statement)
         self.report_token(t.EOF, u'')
 
     #
@@ -111,9 +150,8 @@ class CodeGenerator(NodeVisitor):
             self.consumer.report_number(token)
 
     def report_keyword(self, value):
-        token = self.make_token(t.KEYWORD_TO_TYPE[value], value)
         if self.consumer:
-            self.consumer.report_keyword(token)
+            self.consumer.report_keyword(KEYWORD_TOKENS[value])
 
     def report_identifier(self, value):
         token = self.make_token(t.IDENTIFIER, value)
@@ -121,34 +159,24 @@ class CodeGenerator(NodeVisitor):
             self.consumer.report_identifier(token)
 
     def report_binary_op(self, value):
-        if value in t.KEYWORD_TO_TYPE:
+        if value in KEYWORD_TOKENS:
             self.report_keyword(value)
-        else:
-            type = BINARY_OP_TO_TYPE[value]
-            token = self.make_token(type, value)
-            if self.consumer:
-                self.consumer.report_binary_op(token)
+        elif self.consumer:
+            self.consumer.report_binary_op(BINARY_OP_TOKENS[value])
 
     def report_unary_op(self, value):
-        if value in t.KEYWORD_TO_TYPE:
+        if value in KEYWORD_TOKENS:
             self.report_keyword(value)
-        else:
-            type = UNARY_OP_TO_TYPE[value]
-            token = self.make_token(type, value)
-            if self.consumer:
-                self.consumer.report_unary_op(token)
+        elif self.consumer:
+            self.consumer.report_unary_op(UNARY_OP_TOKENS[value])
 
     def report_prefix_op(self, op):
-        type = UNARY_OP_TO_TYPE[op]
-        token = self.make_token(type, op)
         if self.consumer:
-            self.consumer.report_prefix_op(token)
+            self.consumer.report_prefix_op(UNARY_OP_TOKENS[op])
 
     def report_postfix_op(self, op):
-        type = UNARY_OP_TO_TYPE[op]
-        token = self.make_token(type, op)
         if self.consumer:
-            self.consumer.report_postfix_op(token)
+            self.consumer.report_postfix_op(UNARY_OP_TOKENS[op])
 
     def report_regexp(self, pattern):
         token = self.make_token(t.REGEXP, pattern)
@@ -156,17 +184,21 @@ class CodeGenerator(NodeVisitor):
             self.consumer.report_regexp(token)
 
     def report_literal(self, value):
-        type = t.LITERAL_TO_TYPE[value]
-        token = self.make_token(type, value)
         if self.consumer:
-            self.consumer.report_literal(token)
+            self.consumer.report_literal(LITERAL_TOKENS[value])
 
     #
     # Node utilities
     #
 
     def precedence(self, node):
-        return get_precedence(node)
+        """
+        Get the precedence of a node, computing it at most once per run.
+        """
+        entry = self.precedences.get(id(node))
+        if entry is None:
+            entry = self.precedences[id(node)] = (node, get_precedence(node))
+        return entry[1]
 
     def parenthesize(self, node):
         self.report_literal(u'(')
@@ -192,17 +224,70 @@ class CodeGenerator(NodeVisitor):
             self.report_literal(u';')
 
     def maybe_parens(self, node, parent):
-        parent_precedence = self.precedence(parent)
-        child_precedence = self.precedence(node)
-        if child_precedence < parent_precedence:
+        if self.precedence(node) < self.precedence(parent):
             self.parenthesize(node)
         else:
             self.visit(node)
 
+    def mark_leftmost_for_parens(self, node):
+        """
+        Look if the leftmost node lexically is a FunctionExpression or
+        ObjectLiteral, if so mark it for parens.
+        """
+        while node is not None:
+            left = None
+            if isinstance(node, ast.PropertyAccess):
+                left = node.object
+            elif isinstance(node, (ast.PostfixCountOperation, ast.CallExpression)):
+                left = node.expression
+            elif isinstance(node, (ast.BinaryOperation, ast.CompareOperation)):
+                left = node.left
+            elif isinstance(node, ast.Assignment):
+                left = node.target
+            if self.precedence(node) > self.precedence(left):
+                return
+            if isinstance(left, (ast.FunctionExpression, ast.ObjectLiteral)):
+                self.mark_for_parens(left)
+                return
+            node = left
+
+    def mark_for_parens(self, node):
+        self.marked_for_parens.add(node)
+
     #
     # Generic
     #
 
+    def visit_left_chain(self, node):
+        """
+        Visit an expression whose output starts with its leftmost operand,
+        such as ``a+b`` or ``a.b()``. The chain of leftmost operands is walked
+        with an explicit stack, so long left-nested chains like ``a+b+c+...``
+        or ``a.b().c().d()`` don't recurse once per link. Opening parentheses
+        are reported on the way down, since nothing else precedes the
+        innermost operand, and the rest of each node on the way back up.
+        """
+        chain = []
+        left_operands = LEFT_OPERANDS
+        precedence = self.precedence
+        while True:
+            operand = left_operands.get(node.__class__)
+            if operand is None:
+                break
+            attribute, finish = operand
+            left = getattr(node, attribute)
+            parens = precedence(left) < precedence(node)
+            if parens:
+                self.report_literal(u'(')
+            chain.append((node, finish, parens))
+            node = left
+        self.visit(node)
+        while chain:
+            node, finish, parens = chain.pop()
+            if parens:
+                self.report_literal(u')')
+            getattr(self, finish)(node)
+
     def visit_comma_list(self, node):
         last_index = len(node) - 1
         for i, element in enumerate(node):
@@ -230,13 +315,13 @@ class CodeGenerator(NodeVisitor):
         self.visit_comma_list(node.elements)
         self.report_literal(u']')
 
-    def visit_Assignment(self, node):
-        self.maybe_parens(node.target, node)
+    def finish_Assignment(self, node):
         self.report_binary_op(node.op)
         self.maybe_parens(node.value, node)
 
-    def visit_BinaryOperation(self, node):
-        self.maybe_parens(node.left, node)
+    visit_Assignment = visit_left_chain
+
+    def finish_BinaryOperation(self, node):
         self.report_binary_op(node.op)
         right = node.right
         if self.precedence(right) <= self.precedence(node):
@@ -244,26 +329,30 @@ class CodeGenerator(NodeVisitor):
         else:
             self.visit(right)
 
+    visit_BinaryOperation = visit_left_chain
+
     def visit_Block(self, node):
         self.report_literal(u'{')
         self.visit_statement_list(node.statements)
         self.report_literal(u'}')
 
-    def visit_BracketProperty(self, node):
-        self.maybe_parens(node.object, node)
+    def finish_BracketProperty(self, node):
         self.report_literal(u'[')
         self.visit(node.key)
         self.report_literal(u']')
 
+    visit_BracketProperty = visit_left_chain
+
     def visit_BreakStatement(self, node):
         self.report_keyword(u'break')
 
-    def visit_CallExpression(self, node):
-        self.maybe_parens(node.expression, node)
+    def finish_CallExpression(self, node):
         self.report_literal(u'(')
         self.visit_comma_list(node.arguments)
         self.report_literal(u')')
 
+    visit_CallExpression = visit_left_chain
+
     def visit_CaseClause(self, node):
         if node.label:
             self.report_keyword(u'case')
@@ -273,18 +362,20 @@ class CodeGenerator(NodeVisitor):
         self.report_literal(u':')
         self.visit_statement_list(node.statements)
 
-    def visit_CompareOperation(self, node):
-        self.maybe_parens(node.left, node)
+    def finish_CompareOperation(self, node):
         self.report_binary_op(node.op)
         self.maybe_parens(node.right, node)
 
-    def visit_Conditional(self, node):
-        self.maybe_parens(node.condition, node)
+    visit_CompareOperation = visit_left_chain
+
+    def finish_Conditional(self, node):
         self.report_literal(u'?')
         self.maybe_parens(node.then_expression, node)
         self.report_literal(u':')
         self.maybe_parens(node.else_expression, node)
 
+    visit_Conditional = visit_left_chain
+
     def visit_ContinueStatement(self, node):
         self.report_keyword(u'continue')
         if node.target:
@@ -300,11 +391,12 @@ class CodeGenerator(NodeVisitor):
         self.report_keyword(u'while')
         self.parenthesize(node.condition)
 
-    def visit_DotProperty(self, node):
-        self.maybe_parens(node.object, node)
+    def finish_DotProperty(self, node):
         self.report_literal(u'.')
         self.visit(node.key)
 
+    visit_DotProperty = visit_left_chain
+
     def visit_Elision(self, node):
         pass
 
@@ -312,27 +404,8 @@ class CodeGenerator(NodeVisitor):
         self.report_literal(u';')
 
     def visit_ExpressionStatement(self, node):
-        # Look if the leftmost node lexically is a FunctionExpression or
-        # ObjectLiteral, if so mark it for parens
-        def mark_leftmost_for_parens(node):
-            left = None
-            if isinstance(node, ast.PropertyAccess):
-                left = node.object
-            elif isinstance(node, (ast.PostfixCountOperation, ast.CallExpression)):
-                left = node.expression
-            elif isinstance(node, (ast.BinaryOperation, ast.CompareOperation)):
-                left = node.left
-            elif isinstance(node, ast.Assignment):
-                left = node.target
-            if self.precedence(node) > self.precedence(left):
-                return
-            if isinstance(left, (ast.FunctionExpression, ast.ObjectLiteral)):
-                self.marked_for_parens.add(left)
-                return
-            elif left is not None:
-                return mark_leftmost_for_parens(left)
         expression = node.expression
-        mark_leftmost_for_parens(expression)
+        self.mark_leftmost_for_parens(expression)
         self.visit(expression)
 
     def visit_FalseNode(self, node):
@@ -437,10 +510,11 @@ class CodeGenerator(NodeVisitor):
         self.report_literal(u':')
         self.visit(node.value)
 
-    def visit_PostfixCountOperation(self, node):
-        self.maybe_parens(node.expression, node)
+    def finish_PostfixCountOperation(self, node):
         self.report_postfix_op(node.op)
 
+    visit_PostfixCountOperation = visit_left_chain
+
     def visit_PrefixCountOperation(self, node):
         self.report_prefix_op(node.op)
         self.maybe_parens(node.expression, node)
@@ -534,10 +608,102 @@ class CodeGenerator(NodeVisitor):
         self.parenthesize(node.expression)
         self.visit(node.statement)
 
-def generate_code(ast, consumer=None):
+class StringCodeGenerator(CodeGenerator):
+    """
+    A code generator that appends the minified source text straight to a list
+    buffer instead of reporting ``Token`` objects to a consumer. Only the type
+    of the previous token is kept, which is enough to apply the spacing rules
+    of ``MinifiedPrintConsumer``, so the output is identical.
+    """
+    def __init__(self):
+        super(StringCodeGenerator, self).__init__(None)
+        self.buffer = []
+        self.last_type = None
+
+    def get_string(self):
+        return u''.join(self.buffer)
+
+    def report_token(self, type, value):
+        self.last_type = type
+        self.buffer.append(value)
+
+    def report_spaced_token(self, type, value):
+        if self.last_type in LITERALS:
+            self.buffer.append(u' ')
+        self.last_type = type
+        self.buffer.append(value)
+
+    def report_number(self, value):
+        self.report_spaced_token(t.DECIMAL, value)
+
+    def report_keyword(self, value):
+        self.report_spaced_token(t.KEYWORD_TO_TYPE[value], value)
+
+    def report_identifier(self, value):
+        self.report_spaced_token(t.IDENTIFIER, value)
+
+    def report_binary_op(self, value):
+        if value in t.KEYWORD_TO_TYPE:
+            self.report_keyword(value)
+        else:
+            self.report_token(BINARY_OP_TO_TYPE[value], value)
+
+    def report_unary_op(self, value):
+        if value in t.KEYWORD_TO_TYPE:
+            self.report_keyword(value)
+        else:
+            type = UNARY_OP_TO_TYPE[value]
+            if (type == t.ADD or type == t.SUB) and type == self.last_type:
+                self.buffer.append(u' ')
+            self.report_token(type, value)
+
+    def report_prefix_op(self, op):
+        type = UNARY_OP_TO_TYPE[op]
+        last_type = self.last_type
+        if (type == t.INC and last_type == t.ADD) or\
+                (type == t.DEC and last_type == t.SUB):
+            self.buffer.append(u' ')
+        self.report_token(type, op)
+
+    def report_postfix_op(self, op):
+        self.report_token(UNARY_OP_TO_TYPE[op], op)
+
+    def report_regexp(self, pattern):
+        self.report_token(t.REGEXP, pattern)
+
+    def report_literal(self, value):
+        self.report_token(t.LITERAL_TO_TYPE[value], value)
+
+def generate_code(ast, consumer=None, stats=None):
     """
     Generate tokens for a given abstract syntax tree and report them to the
-    given token consumer.
+    given token consumer. Visits and tokens are counted in ``stats`` if a
+    ``VisitStats`` object is given.
+    """
+    if stats is None:
+        generator = CodeGenerator(consumer)
+    else:
+        from .stats import InstrumentedCodeGenerator
+        generator = InstrumentedCodeGenerator(consumer, stats)
+    generator.generate(ast)
+
+def generate_code_stream(statements, consumer=None):
+    """
+    Generate tokens for an iterable of top-level statements and report them to
+    the given token consumer.
     """
     generator = CodeGenerator(consumer)
+    generator.generate_statements(statements)
+
+def generate_string(ast, stats=None):
+    """
+    Generate the minified source text for a given abstract syntax tree,
+    counting visits and tokens in ``stats`` if one is given.
+    """
+    if stats is None:
+        generator = StringCodeGenerator()
+    else:
+        from .stats import InstrumentedStringCodeGenerator
+        generator = InstrumentedStringCodeGenerator(stats)
     generator.generate(ast)
+    return generator.get_string()
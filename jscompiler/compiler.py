@@ -0,0 +1,56 @@
+"""
+A reusable in-memory compiler for embedding the minifier in other programs.
+"""
+from .code_generator import StringCodeGenerator
+from .fold import ConstantFoldingTransformer, fold_constants
+from .locator_parser import NO_LOCATIONS, PARSER_CLASSES, make_string_parser
+from .rename import RenameAnalyzer, rename_locals
+from .visitor import get_dispatch_table
+
+
+class Compiler(object):
+    """
+    Compiles source strings with a fixed set of options. The visitor dispatch
+    tables are built once on construction and every call to ``compile`` uses
+    fresh parser, analyzer and generator objects, so one instance can be
+    shared between threads. Nothing is read from or written to disk.
+
+    Locations are not recorded by default, as the output never uses them.
+    """
+    def __init__(self, rename=False, locations=NO_LOCATIONS, fold=False):
+        if locations not in PARSER_CLASSES:
+            raise ValueError('unknown locations mode %r' % (locations,))
+        self.rename = rename
+        self.locations = locations
+        self.fold = fold
+        get_dispatch_table(StringCodeGenerator)
+        if fold:
+            get_dispatch_table(ConstantFoldingTransformer)
+        if rename:
+            get_dispatch_table(RenameAnalyzer)
+
+    @classmethod
+    def from_options(cls, options):
+        """
+        Make a compiler from parsed command line options.
+        """
+        return cls(options.rename, options.locations, options.fold)
+
+    def compile(self, source, filename=None):
+        """
+        Minify a source string, returning the output as a unicode string.
+        Raises ``ParseException`` for invalid sources.
+        """
+        if isinstance(source, unicode):
+            source = source.encode('utf-8')
+        parser = make_string_parser(
+            source, filename, locations=self.locations
+        )
+        ast = parser.parse()
+        if self.fold:
+            ast = fold_constants(ast)
+        if self.rename:
+            ast = rename_locals(ast)
+        generator = StringCodeGenerator()
+        generator.generate(ast)
+        return generator.get_string()
@@ -0,0 +1,527 @@
+"""
+Constant folding of operations on literal values with JavaScript semantics.
+
+Numbers are represented as floats, strings as unicode strings, booleans as
+``bool`` and ``null`` and ``undefined`` as the ``NULL`` and ``UNDEFINED``
+markers.
+"""
+import math
+import re
+
+from bigrig import ast
+
+from .code_generator import generate_string
+from .visitor import NodeTransformer
+
+
+class Marker(object):
+    """
+    A unique value standing in for ``null`` or ``undefined``.
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+NULL = Marker('null')
+UNDEFINED = Marker('undefined')
+NOT_CONSTANT = Marker('not constant')
+
+NAN = float('nan')
+INFINITY = float('inf')
+
+WHITESPACE = (
+    u'\t\n\x0b\x0c\r \xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005'
+    u'\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff'
+)
+
+DECIMAL_PATTERN = re.compile(
+    r'^[+-]?(?:\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)$'
+)
+HEX_PATTERN = re.compile(r'^0[xX]([0-9a-fA-F]+)$')
+DECIMAL_LITERAL_PATTERN = re.compile(
+    r'^(?:0|[1-9]\d*)?(?:\.\d*)?(?:[eE][+-]?\d+)?$'
+)
+
+SIMPLE_ESCAPES = {
+    u'b': u'\b',
+    u'f': u'\f',
+    u'n': u'\n',
+    u'r': u'\r',
+    u't': u'\t',
+    u'v': u'\x0b',
+}
+
+LINE_TERMINATORS = u'\n\r\u2028\u2029'
+
+#
+# Type conversions
+#
+
+def type_of(value):
+    if value is NULL:
+        return u'object'
+    if value is UNDEFINED:
+        return u'undefined'
+    if type(value) is bool:
+        return u'boolean'
+    if type(value) is float:
+        return u'number'
+    return u'string'
+
+def to_boolean(value):
+    if type(value) is bool:
+        return value
+    if type(value) is float:
+        return not (value == 0 or math.isnan(value))
+    if type(value) is unicode:
+        return len(value) > 0
+    return False
+
+def hex_to_number(digits):
+    """
+    Convert hexadecimal digits to a number, which is ``Infinity`` when they
+    are too many for a float.
+    """
+    try:
+        return float(int(digits, 16))
+    except OverflowError:
+        return INFINITY
+
+def string_to_number(value):
+    """
+    Convert a string to a number as the ``StringNumericLiteral`` grammar of
+    ECMA-262 section 9.3.1 does.
+    """
+    value = value.strip(WHITESPACE)
+    if not value:
+        return 0.0
+    match = HEX_PATTERN.match(value)
+    if match:
+        return hex_to_number(match.group(1))
+    unsigned = value.lstrip(u'+-')
+    if unsigned == u'Infinity' and len(value) - len(unsigned) <= 1:
+        return -INFINITY if value[0] == u'-' else INFINITY
+    if DECIMAL_PATTERN.match(value):
+        return float(value)
+    return NAN
+
+def to_number(value):
+    if type(value) is float:
+        return value
+    if type(value) is bool:
+        return value and 1.0 or 0.0
+    if value is NULL:
+        return 0.0
+    if value is UNDEFINED:
+        return NAN
+    return string_to_number(value)
+
+def number_to_string(value):
+    """
+    Convert a number to a string as ECMA-262 section 9.8.1 does. The
+    shortest round tripping ``repr`` gives the digits ``s`` and the exponent
+    ``n`` the algorithm asks for.
+    """
+    if math.isnan(value):
+        return u'NaN'
+    if value == 0:
+        return u'0'
+    if value < 0:
+        return u'-' + number_to_string(-value)
+    if math.isinf(value):
+        return u'Infinity'
+    mantissa, e, exponent = repr(value).partition('e')
+    whole, point, fraction = mantissa.partition('.')
+    digits = whole + fraction
+    n = len(whole) + int(exponent or 0)
+    stripped = digits.lstrip('0')
+    n -= len(digits) - len(stripped)
+    digits = stripped.rstrip('0')
+    k = len(digits)
+    if k <= n <= 21:
+        result = digits + '0' * (n - k)
+    elif 0 < n <= 21:
+        result = digits[:n] + '.' + digits[n:]
+    elif -6 < n <= 0:
+        result = '0.' + '0' * -n + digits
+    else:
+        e = n - 1
+        sign = e < 0 and '-' or '+'
+        if k == 1:
+            result = '%se%s%d' % (digits, sign, abs(e))
+        else:
+            result = '%s.%se%s%d' % (digits[0], digits[1:], sign, abs(e))
+    return unicode(result)
+
+def to_string(value):
+    if type(value) is unicode:
+        return value
+    if type(value) is float:
+        return number_to_string(value)
+    if type(value) is bool:
+        return value and u'true' or u'false'
+    return value.name.decode('ascii')
+
+def to_uint32(value):
+    number = to_number(value)
+    if math.isnan(number) or math.isinf(number):
+        return 0
+    return int(number) % 0x100000000
+
+def wrap_int32(number):
+    number %= 0x100000000
+    if number >= 0x80000000:
+        number -= 0x100000000
+    return number
+
+def to_int32(value):
+    return wrap_int32(to_uint32(value))
+
+#
+# Operators
+#
+
+def add(left, right):
+    if type(left) is unicode or type(right) is unicode:
+        return to_string(left) + to_string(right)
+    return to_number(left) + to_number(right)
+
+def divide(left, right):
+    left, right = to_number(left), to_number(right)
+    if right == 0:
+        if left == 0 or math.isnan(left):
+            return NAN
+        return math.copysign(INFINITY, left) * math.copysign(1.0, right)
+    return left / right
+
+def remainder(left, right):
+    left, right = to_number(left), to_number(right)
+    if math.isnan(left) or math.isnan(right) or math.isinf(left) or\
+            right == 0:
+        return NAN
+    return math.fmod(left, right)
+
+def strict_equals(left, right):
+    if type_of(left) != type_of(right) or (left is NULL) != (right is NULL):
+        return False
+    if left is NULL or left is UNDEFINED:
+        return True
+    return left == right
+
+def loose_equals(left, right):
+    if type_of(left) == type_of(right) and (left is NULL) == (right is NULL):
+        return strict_equals(left, right)
+    if left in (NULL, UNDEFINED) or right in (NULL, UNDEFINED):
+        return left in (NULL, UNDEFINED) and right in (NULL, UNDEFINED)
+    return to_number(left) == to_number(right)
+
+def compare(left, right, operator):
+    """
+    Compare two values as the abstract relational comparison does. Strings
+    are compared by UTF-16 code unit, and any comparison with ``NaN`` is
+    false.
+    """
+    if type(left) is unicode and type(right) is unicode:
+        left = left.encode('utf-16-be')
+        right = right.encode('utf-16-be')
+    else:
+        left, right = to_number(left), to_number(right)
+    return operator(left, right)
+
+def shift_left(left, right):
+    return wrap_int32(to_int32(left) << (to_uint32(right) & 31))
+
+def shift_right(left, right):
+    return to_int32(left) >> (to_uint32(right) & 31)
+
+def unsigned_shift_right(left, right):
+    return to_uint32(left) >> (to_uint32(right) & 31)
+
+BINARY_OPERATORS = {
+    u'+': add,
+    u'-': lambda left, right: to_number(left) - to_number(right),
+    u'*': lambda left, right: to_number(left) * to_number(right),
+    u'/': divide,
+    u'%': remainder,
+    u'<<': shift_left,
+    u'>>': shift_right,
+    u'>>>': unsigned_shift_right,
+    u'&': lambda left, right: to_int32(left) & to_int32(right),
+    u'|': lambda left, right: to_int32(left) | to_int32(right),
+    u'^': lambda left, right: to_int32(left) ^ to_int32(right),
+    u'==': loose_equals,
+    u'!=': lambda left, right: not loose_equals(left, right),
+    u'===': strict_equals,
+    u'!==': lambda left, right: not strict_equals(left, right),
+    u'<': lambda left, right: compare(left, right, lambda a, b: a < b),
+    u'>': lambda left, right: compare(left, right, lambda a, b: a > b),
+    u'<=': lambda left, right: compare(left, right, lambda a, b: a <= b),
+    u'>=': lambda left, right: compare(left, right, lambda a, b: a >= b),
+}
+
+UNARY_OPERATORS = {
+    u'!': lambda value: not to_boolean(value),
+    u'-': lambda value: -to_number(value),
+    u'+': to_number,
+    u'~': lambda value: ~to_int32(value),
+}
+
+#
+# Literals
+#
+
+def parse_number(text):
+    """
+    Get the value of a numeric literal, or ``NOT_CONSTANT`` for legacy octal
+    literals whose meaning depends on strict mode.
+    """
+    match = HEX_PATTERN.match(text)
+    if match:
+        return hex_to_number(match.group(1))
+    if DECIMAL_LITERAL_PATTERN.match(text):
+        return float(text)
+    return NOT_CONSTANT
+
+def parse_string(text):
+    """
+    Get the value of a quoted string literal, or ``NOT_CONSTANT`` for
+    literals using legacy octal escapes.
+    """
+    body = text[1:-1]
+    if u'\\' not in body:
+        return body
+    try:
+        return unescape_string(body)
+    except (IndexError, ValueError):
+        return NOT_CONSTANT
+
+def unescape_string(body):
+    chars = []
+    index = 0
+    length = len(body)
+    while index < length:
+        char = body[index]
+        index += 1
+        if char != u'\\':
+            chars.append(char)
+            continue
+        char = body[index]
+        index += 1
+        if char in SIMPLE_ESCAPES:
+            chars.append(SIMPLE_ESCAPES[char])
+        elif char == u'0' and (index == length or not body[index].isdigit()):
+            chars.append(u'\0')
+        elif char.isdigit():
+            return NOT_CONSTANT
+        elif char == u'x':
+            chars.append(unichr(int(body[index:index + 2], 16)))
+            index += 2
+        elif char == u'u':
+            chars.append(unichr(int(body[index:index + 4], 16)))
+            index += 4
+        elif char in LINE_TERMINATORS:
+            if char == u'\r' and body[index:index + 1] == u'\n':
+                index += 1
+        else:
+            chars.append(char)
+    return u''.join(chars)
+
+def quote_string(value):
+    """
+    Quote a string with the quote character needing fewer escapes.
+    """
+    quote = u'"'
+    if value.count(u'"') > value.count(u"'"):
+        quote = u"'"
+    chars = [quote]
+    last_index = len(value) - 1
+    for index, char in enumerate(value):
+        code = ord(char)
+        if char == quote or char == u'\\':
+            chars.append(u'\\' + char)
+        elif char == u'\n':
+            chars.append(u'\\n')
+        elif char == u'\r':
+            chars.append(u'\\r')
+        elif char == u'\0':
+            if index < last_index and value[index + 1].isdigit():
+                chars.append(u'\\x00')
+            else:
+                chars.append(u'\\0')
+        elif char == u'/' and index and value[index - 1] == u'<':
+            chars.append(u'\\/')
+        elif code < 0x20 and char != u'\t':
+            chars.append(u'\\x%02x' % code)
+        elif char in u'\u2028\u2029' or 0xd800 <= code <= 0xdfff:
+            chars.append(u'\\u%04x' % code)
+        else:
+            chars.append(char)
+    chars.append(quote)
+    return u''.join(chars)
+
+def format_number(value):
+    """
+    Get the shortest literal for a non-negative finite number.
+    """
+    text = number_to_string(value).replace(u'e+', u'e')
+    if text.startswith(u'0.'):
+        text = text[1:]
+    stripped = text.rstrip(u'0')
+    zeros = len(text) - len(stripped)
+    if u'.' not in text and u'e' not in text and zeros > 2:
+        text = u'%se%d' % (stripped, zeros)
+    return text
+
+def make_literal(value):
+    """
+    Build the smallest expression node for a constant value, or return
+    ``None`` for values without a literal such as ``NaN`` and ``Infinity``.
+    """
+    if type(value) is bool:
+        return ast.UnaryOperation(
+            u'!', ast.NumberLiteral(value and u'0' or u'1')
+        )
+    if type(value) is float:
+        if math.isnan(value) or math.isinf(value):
+            return None
+        if value < 0 or math.copysign(1.0, value) < 0:
+            return ast.UnaryOperation(
+                u'-', ast.NumberLiteral(format_number(-value))
+            )
+        return ast.NumberLiteral(format_number(value))
+    if type(value) is unicode:
+        return ast.StringLiteral(quote_string(value))
+    if value is NULL:
+        return ast.NullNode()
+    return ast.VoidOperation(ast.NumberLiteral(u'0'))
+
+#
+# Transformer
+#
+
+class ConstantFoldingTransformer(NodeTransformer):
+    """
+    Replaces unary, binary, comparison, ``typeof`` and ``void`` operations on
+    constant operands with their value, whenever the value can be written
+    no longer than the operation. The values of constant operations left in
+    place are remembered, so enclosing operations can still be folded.
+    """
+    def __init__(self):
+        self.values = {}
+        super(ConstantFoldingTransformer, self).__init__()
+
+    def get_value(self, node):
+        """
+        Get the constant value of an already visited node, or
+        ``NOT_CONSTANT``.
+        """
+        node_class = node.__class__
+        if node_class is ast.NumberLiteral:
+            return parse_number(node.value)
+        if node_class is ast.StringLiteral:
+            return parse_string(node.value)
+        if node_class is ast.TrueNode:
+            return True
+        if node_class is ast.FalseNode:
+            return False
+        if node_class is ast.NullNode:
+            return NULL
+        entry = self.values.get(id(node))
+        if entry is None:
+            return NOT_CONSTANT
+        return entry[1]
+
+    def fold(self, node, value):
+        """
+        Replace a constant operation with its value if that is no longer.
+        """
+        if value is NOT_CONSTANT:
+            return node
+        self.values[id(node)] = (node, value)
+        literal = make_literal(value)
+        if literal is None:
+            return node
+        text = generate_string(literal)
+        original = generate_string(node)
+        if len(text) > len(original) or text == original:
+            return node
+        self.values[id(literal)] = (literal, value)
+        return literal
+
+    def visit_UnaryOperation(self, node):
+        node = self.generic_visit(node)
+        operator = UNARY_OPERATORS.get(node.op)
+        value = self.get_value(node.expression)
+        if operator is None or value is NOT_CONSTANT:
+            return node
+        value = operator(value)
+        if type(value) in (int, long):
+            value = float(value)
+        return self.fold(node, value)
+
+    def visit_TypeofOperation(self, node):
+        node = self.generic_visit(node)
+        value = self.get_value(node.expression)
+        if value is NOT_CONSTANT:
+            return node
+        return self.fold(node, type_of(value))
+
+    def visit_VoidOperation(self, node):
+        node = self.generic_visit(node)
+        if self.get_value(node.expression) is NOT_CONSTANT:
+            return node
+        return self.fold(node, UNDEFINED)
+
+    def visit_BinaryOperation(self, node):
+        node = self.generic_visit(node)
+        left = self.get_value(node.left)
+        if left is NOT_CONSTANT:
+            return node
+        if node.op in (u'&&', u'||'):
+            # The selected operand is the value, so only fold if the right
+            # one is constant or not selected, keeping calls like
+            # ``(1&&a.b)()`` from changing their ``this`` value.
+            if to_boolean(left) == (node.op == u'||'):
+                return self.fold(node, left)
+            right = self.get_value(node.right)
+            if right is NOT_CONSTANT:
+                return node
+            return self.fold(node, right)
+        right = self.get_value(node.right)
+        operator = BINARY_OPERATORS.get(node.op)
+        if operator is None or right is NOT_CONSTANT:
+            return node
+        value = operator(left, right)
+        if type(value) in (int, long):
+            value = float(value)
+        return self.fold(node, value)
+
+    visit_CompareOperation = visit_BinaryOperation
+
+    def visit_ExpressionStatement(self, node):
+        # A string statement could land in a directive prologue, and
+        # ``"use "+"strict"`` must not turn into a ``"use strict"`` directive
+        expression = node.expression
+        node = self.generic_visit(node)
+        if node.expression.__class__ is ast.StringLiteral and\
+                expression.__class__ is not ast.StringLiteral:
+            node.expression = expression
+        return node
+
+    def visit_DotProperty(self, node):
+        # A folded number would read as a decimal point, as in ``3.toFixed``
+        object = node.object
+        node = self.generic_visit(node)
+        if node.object is not object and\
+                node.object.__class__ is ast.NumberLiteral:
+            node.object = object
+        return node
+
+def fold_constants(ast):
+    """
+    Fold the constant operations of a tree, returning the new tree.
+    """
+    transformer = ConstantFoldingTransformer()
+    return transformer.visit(ast)
@@ -1,59 +1,165 @@
 """
 Classes and utilities for adding location information to syntax tree nodes.
 """
-import types
+from collections import namedtuple
 from functools import wraps
 
 from bigrig import parser, node
 
-class LocatedNodeMixin(object):
+COLUMN_BITS = 32
+COLUMN_MASK = (1 << COLUMN_BITS) - 1
+
+FULL_LOCATIONS = 'full'
+COMPACT_LOCATIONS = 'compact'
+NO_LOCATIONS = 'none'
+
+def wrap_parse_method(method):
+    """
+    Create a new parse method that adds locator information to the node
+    it returns.
+    """
+    @wraps(method)
+    def wrapped(self, *args, **kwargs):
+        locator = self.get_next_locator()
+        result = method(self, *args, **kwargs)
+        if isinstance(result, node.Node):
+            result.locator = locator
+        return result
+    wrapped.locates_nodes = True
+    return wrapped
+
+def wrap_compact_parse_method(method):
     """
-    Adds location information for abstract syntax tree nodes.
+    Create a new parse method that adds a packed integer position to the node
+    it returns.
     """
-    def __init__(self, *args, **kwargs):
-        super(LocatedNodeMixin, self).__init__(*args, **kwargs)
-        self._method_cache = {}
+    @wraps(method)
+    def wrapped(self, *args, **kwargs):
+        position = self.get_next_position()
+        result = method(self, *args, **kwargs)
+        if isinstance(result, node.Node):
+            result.position = position
+        return result
+    wrapped.locates_nodes = True
+    return wrapped
 
+def locate_nodes(cls, wrapper=wrap_parse_method):
+    """
+    A class decorator that replaces every ``parse_*`` method of a parser
+    class with a wrapper recording the location of the first token consumed.
+
+    The wrappers are built once per class, so attribute access on parser
+    instances carries no extra cost.
+    """
+    for name in dir(cls):
+        if not name.startswith('parse_'):
+            continue
+        method = getattr(cls, name)
+        if not callable(method) or getattr(method, 'locates_nodes', False):
+            continue
+        function = getattr(method, '__func__', method)
+        setattr(cls, name, wrapper(function))
+    return cls
+
+class LocatedNodeMixin(object):
+    """
+    Adds location information for abstract syntax tree nodes. Concrete parser
+    classes must be decorated with ``locate_nodes``.
+    """
     def get_next_locator(self):
         token = self.token_stream.peek()
         return token.locator
 
-    def wrap_method(self, method):
-        """
-        Create a new parse method that adds locator information to the node
-        it returns.
-        """
-        @wraps(method)
-        def wrapped(self, *args, **kwargs):
-            locator = self.get_next_locator()
-            result = method(*args, **kwargs)
-            if isinstance(result, node.Node):
-                result.locator = locator
-            return result
-        return types.MethodType(wrapped, self)
-
-    def __getattribute__(self, name):
-        cache = super(LocatedNodeMixin, self).__getattribute__('_method_cache')
-        if name in cache:
-            return cache[name]
-        elif name.startswith('parse_'):
-            original = object.__getattribute__(self, name)
-            wrapped = self.wrap_method(original)
-            cache[name] = wrapped
-            return wrapped
-        return super(LocatedNodeMixin, self).__getattribute__(name)
-
+@locate_nodes
 class LocatorParser(LocatedNodeMixin, parser.Parser):
     """
     Concrete implementation of a location tracking parser.
     """
     pass
 
+#
+# Compact locations
+#
+
+class SourceLocation(namedtuple('SourceLocation', 'filename line column')):
+    """
+    A materialized source location.
+    """
+    __slots__ = ()
+
+class LocationTable(object):
+    """
+    Translates the packed integer positions stored on nodes by
+    ``CompactLocatorParser`` back into source locations for a single file.
+    """
+    def __init__(self, filename=None):
+        self.filename = filename
+
+    def unpack(self, position):
+        return SourceLocation(
+            self.filename, position >> COLUMN_BITS, position & COLUMN_MASK
+        )
+
+class CompactLocatedNodeMixin(object):
+    """
+    Stores a single integer position on every node instead of a reference to
+    the token locator, keeping the locators collectable. The program node
+    carries the ``LocationTable`` needed to materialize them.
+    """
+    locations = None
+
+    def get_next_position(self):
+        locator = self.token_stream.peek().locator
+        return (locator.line << COLUMN_BITS) | locator.column
+
+    def parse(self):
+        program = super(CompactLocatedNodeMixin, self).parse()
+        program.locations = self.locations or LocationTable()
+        return program
+
+class CompactLocatorParser(CompactLocatedNodeMixin, parser.Parser):
+    """
+    Concrete implementation of a compact location tracking parser.
+    """
+    pass
+
+locate_nodes(CompactLocatorParser, wrap_compact_parse_method)
+
+PARSER_CLASSES = {
+    FULL_LOCATIONS: LocatorParser,
+    COMPACT_LOCATIONS: CompactLocatorParser,
+    NO_LOCATIONS: parser.Parser,
+}
+
+def get_location(node, locations=None):
+    """
+    Get the location of a node parsed in any location mode, or ``None`` if it
+    has none. Compact positions are materialized with the given
+    ``LocationTable``.
+    """
+    locator = getattr(node, 'locator', None)
+    if locator is not None:
+        return locator
+    position = getattr(node, 'position', None)
+    if position is not None and locations is not None:
+        return locations.unpack(position)
+    return None
+
 #
 # Utility functions
 #
 
-def make_string_parser(string, filename=None, line=0, column=0, encoding='utf-8'):
+def make_parser(stream, filename=None, locations=FULL_LOCATIONS):
+    """
+    Make a parser for a token stream in the given location mode.
+    """
+    new_parser = PARSER_CLASSES[locations](stream)
+    if locations == COMPACT_LOCATIONS:
+        new_parser.locations = LocationTable(filename)
+    return new_parser
+
+def make_string_parser(string, filename=None, line=0, column=0, encoding='utf-8',
+                       locations=FULL_LOCATIONS):
     """
     Make a parser for a string that produces nodes with location information.
     """
@@ -62,18 +168,20 @@ def make_string_parser(string, filename=None, line=0, column=0, encoding='utf-8'
         string, filename, line, column, encoding
     )
     stream = TokenStreamAllowReserved(scanner)
-    return LocatorParser(stream)
+    return make_parser(stream, filename, locations)
 
-def parse_string(string, filename=None, line=0, column=0, encoding='utf-8'):
+def parse_string(string, filename=None, line=0, column=0, encoding='utf-8',
+                 locations=FULL_LOCATIONS):
     """
     Parse a string into an abstract syntax tree whose nodes have location information.
     """
     parse = make_string_parser(
-        string, filename, line, column, encoding
+        string, filename, line, column, encoding, locations
     )
     return parse.parse()
 
-def make_file_parser(fd, filename=None, line=0, column=0, encoding='utf-8'):
+def make_file_parser(fd, filename=None, line=0, column=0, encoding='utf-8',
+                     locations=FULL_LOCATIONS):
     """
     Make a parser for a file that produces nodes with location information.
     """
@@ -82,12 +190,31 @@ def make_file_parser(fd, filename=None, line=0, column=0, encoding='utf-8'):
         fd, filename, line, column, encoding
     )
     stream = TokenStreamAllowReserved(scanner)
-    return LocatorParser(stream)
+    return make_parser(stream, filename, locations)
+
+def read_source(fd):
+    """
+    Read the whole of a file object as encoded bytes.
+    """
+    return fd.read()
+
+def iter_source_elements(parser):
+    """
+    Parse the input one top-level source element at a time, yielding each as
+    soon as it is complete instead of building the whole program. Every
+    element goes through ``parse_statement``, as in the parser's own source
+    element loop, which also handles function declarations.
+    """
+    from bigrig import token as t
+    stream = parser.token_stream
+    while stream.peek().type != t.EOF:
+        yield parser.parse_statement()
 
-def parse_file(filename, line=0, column=0, encoding='utf-8'):
+def parse_file(filename, line=0, column=0, encoding='utf-8',
+               locations=FULL_LOCATIONS):
     """
     Parse a file into an abstract syntax tree whose nodes have location information.
     """
     fd = open(filename, 'rb')
-    parse = make_file_parser(fd, filename, line, column, encoding)
+    parse = make_file_parser(fd, filename, line, column, encoding, locations)
     return parse.parse()
@@ -1,33 +1,75 @@
 import string
+from bisect import bisect_right
 
+from bigrig.constants import RESERVED_NAMES, KEYWORDS
 from bigrig.utils import is_identifier_start, is_identifier_part
 
 IDENTIFIER_START_CHARS = unicode(string.ascii_letters + "$_")
 IDENTIFIER_CHARS = unicode(IDENTIFIER_START_CHARS + string.digits)
 DISALLOWED_NAMES = frozenset((
     u'as', u'is', u'do', u'if', u'in', u'for', u'int', u'new', u'try', u'use', u'var'
-))
-
-def build_names_list(disallowed):
-    possible_names = []
-    for first in IDENTIFIER_START_CHARS:
-        possible_names.append(first)
-    for first in IDENTIFIER_START_CHARS:
-        for second in IDENTIFIER_CHARS:
-            ident = u'%s%s' % (first, second)
-            if ident in disallowed:
-                continue
-            possible_names.append(ident)
-    for first in IDENTIFIER_START_CHARS:
-        for second in IDENTIFIER_CHARS:
-            for third in IDENTIFIER_CHARS:
-                ident = u'%s%s%s' % (first, second, third)
-                if ident in disallowed:
-                    continue
-                possible_names.append(ident)
-    return possible_names
-
-SHORTNAMES = build_names_list(DISALLOWED_NAMES)
+)).union(RESERVED_NAMES).union(KEYWORDS)
+
+def name_at(index):
+    """
+    Get the identifier at the given position in the sequence of all
+    identifiers ordered by length, then by character position in
+    ``IDENTIFIER_START_CHARS`` and ``IDENTIFIER_CHARS``.
+    """
+    start_count = len(IDENTIFIER_START_CHARS)
+    part_count = len(IDENTIFIER_CHARS)
+    length = 1
+    block = start_count
+    while index >= block:
+        index -= block
+        block *= part_count
+        length += 1
+    chars = []
+    for i in range(length - 1):
+        index, part = divmod(index, part_count)
+        chars.append(IDENTIFIER_CHARS[part])
+    chars.append(IDENTIFIER_START_CHARS[index])
+    chars.reverse()
+    return u''.join(chars)
+
+def index_of(name):
+    """
+    Get the position of an identifier in the sequence ``name_at`` walks, or
+    ``None`` if it is not in the sequence.
+    """
+    if not name or name[0] not in IDENTIFIER_START_CHARS:
+        return None
+    part_count = len(IDENTIFIER_CHARS)
+    index = IDENTIFIER_START_CHARS.index(name[0])
+    for char in name[1:]:
+        part = IDENTIFIER_CHARS.find(char)
+        if part < 0:
+            return None
+        index = index * part_count + part
+    block = len(IDENTIFIER_START_CHARS)
+    for i in range(len(name) - 1):
+        index += block
+        block *= part_count
+    return index
+
+def build_skip_table(names):
+    """
+    Build the table ``next_index`` uses to step over the given names. Entry
+    ``i`` is how many allowed names come before the ``i``-th skipped one.
+    """
+    indices = sorted(set(
+        index for index in map(index_of, names) if index is not None
+    ))
+    return [index - i for i, index in enumerate(indices)]
+
+def next_index(position, skip_table):
+    """
+    Get the index in the ``name_at`` sequence of the allowed name at the
+    given position, with the names of the skip table left out.
+    """
+    return position + bisect_right(skip_table, position)
+
+DISALLOWED_SKIP_TABLE = build_skip_table(DISALLOWED_NAMES)
 
 def is_identifier(string):
     if not len(string):
@@ -41,11 +83,34 @@ def is_identifier(string):
 
 
 class NameGenerator(object):
-    def __init__(self, name_list=SHORTNAMES, index=0):
-        self.name_list = name_list
-        self.index = index
-
-    def next(self):
-        name = self.name_list[self.index]
-        self.index += 1
-        return name
+    """
+    Lazily generates the shortest identifiers first, without limit, skipping
+    reserved words and any names in ``disallowed``. The names to skip are
+    looked up in a table rather than generated and rejected, so each name
+    takes constant time. ``position`` is the number of allowed names to start
+    after.
+    """
+    def __init__(self, position=0, disallowed=DISALLOWED_NAMES):
+        self.position = position
+        self.disallowed = disallowed
+        if disallowed is DISALLOWED_NAMES:
+            self.skip_table = DISALLOWED_SKIP_TABLE
+        else:
+            self.skip_table = build_skip_table(disallowed)
+
+    def __iter__(self):
+        return self
+
+    def next(self, disallowed=None):
+        """
+        Get the next name that is neither disallowed for this generator nor
+        in the given set of names. Only names in the given set are generated
+        and then passed over.
+        """
+        while True:
+            name = name_at(next_index(self.position, self.skip_table))
+            self.position += 1
+            if disallowed is None or name not in disallowed:
+                return name
+
+    __next__ = next
@@ -62,12 +62,38 @@ NODE_TYPE_TO_PRECEDENCE = {
     ast.NewExpression: 17,
 }
 
+LEAF_PRECEDENCE = 20
+
+# Node classes with a fixed precedence
+CLASS_TO_PRECEDENCE = dict(NODE_TYPE_TO_PRECEDENCE)
+
+# Node classes whose precedence depends on their operator
+CLASS_TO_OP_TABLE = {
+    ast.UnaryOperation: UNARY_OPS,
+    ast.BinaryOperation: BINARY_OPS,
+    ast.CompareOperation: BINARY_OPS,
+    ast.Assignment: BINARY_OPS,
+}
+
+def classify(node):
+    """
+    Add the class of a node not seen before to the dispatch tables.
+    """
+    cls = node.__class__
+    if isinstance(node, ast.UnaryOperation):
+        CLASS_TO_OP_TABLE[cls] = UNARY_OPS
+    elif hasattr(node, 'op'):
+        CLASS_TO_OP_TABLE[cls] = BINARY_OPS
+    else:
+        CLASS_TO_PRECEDENCE[cls] = LEAF_PRECEDENCE
+
 def precedence(node):
-    try:
-        if node.__class__ in NODE_TYPE_TO_PRECEDENCE:
-            return NODE_TYPE_TO_PRECEDENCE[node.__class__]
-        elif isinstance(node, ast.UnaryOperation):
-            return UNARY_OPS[node.op]
-        return BINARY_OPS[node.op]
-    except (KeyError, AttributeError):
-        return 20
+    cls = node.__class__
+    value = CLASS_TO_PRECEDENCE.get(cls)
+    if value is not None:
+        return value
+    table = CLASS_TO_OP_TABLE.get(cls)
+    if table is not None:
+        return table.get(node.op, LEAF_PRECEDENCE)
+    classify(node)
+    return precedence(node)
@@ -0,0 +1,205 @@
+"""
+Per phase timing and memory measurements of a compile.
+
+Peak traced memory per phase is measured with ``tracemalloc`` when it is
+available. The peak resident set size of the whole process so far, from
+``resource``, is recorded at the end of every phase as well. It is a high
+water mark, so it only shows the phases that raised it, and it is the only
+memory figure on Python 2.
+
+Measurements are taken by ``compile_profiled`` only. The regular compile
+functions carry no instrumentation at all, so profiling costs nothing when it
+is turned off.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from bigrig.node import Node
+
+from .visitor import NodeVisitor
+
+
+class NodeCounter(NodeVisitor):
+    """
+    Counts the nodes of a tree.
+    """
+    def __init__(self):
+        self.count = 0
+        super(NodeCounter, self).__init__()
+
+    def visit(self, node):
+        if isinstance(node, Node):
+            self.count += 1
+        return super(NodeCounter, self).visit(node)
+
+def count_nodes(ast):
+    counter = NodeCounter()
+    counter.visit(ast)
+    return counter.count
+
+def get_cpu_time():
+    times = os.times()
+    return times[0] + times[1]
+
+def get_max_rss():
+    """
+    Get the peak resident set size of this process in bytes.
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return rss
+    return rss * 1024
+
+class PhaseStats(object):
+    """
+    The measurements of one phase of a compile. ``peak_memory`` is the peak
+    traced memory of the phase, or ``None`` without ``tracemalloc``.
+    ``peak_rss`` is the peak resident set size of the process at the end of
+    the phase, or ``None`` without ``resource``.
+    """
+    __slots__ = ('filename', 'name', 'wall_time', 'cpu_time', 'peak_memory',
+                 'peak_rss', 'nodes', 'tree')
+
+    fields = __slots__[:-1]
+
+    def __init__(self, filename, name):
+        self.filename = filename
+        self.name = name
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_memory = None
+        self.peak_rss = None
+        self.nodes = None
+        self.tree = None
+
+    def as_dict(self):
+        return dict((name, getattr(self, name)) for name in self.fields)
+
+class Profiler(object):
+    """
+    Records the wall time, CPU time, peak memory and node count of each
+    compile phase. If given, ``callback`` is called with the ``PhaseStats``
+    of every phase as it finishes.
+    """
+    def __init__(self, trace_memory=True, callback=None):
+        self.trace_memory = trace_memory and tracemalloc is not None
+        self.measure_rss = trace_memory and resource is not None
+        self.callback = callback
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name, filename=None):
+        """
+        Measure the enclosed block as the named phase. The block may set the
+        ``nodes`` attribute of the yielded ``PhaseStats``, or set its ``tree``
+        attribute to have the nodes of a tree counted once the clocks have
+        stopped.
+        """
+        stats = PhaseStats(filename, name)
+        started_tracing = False
+        base_memory = 0
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                if hasattr(tracemalloc, 'reset_peak'):
+                    tracemalloc.reset_peak()
+                base_memory = tracemalloc.get_traced_memory()[0]
+            else:
+                tracemalloc.start()
+                started_tracing = True
+        cpu_start = get_cpu_time()
+        wall_start = time.time()
+        try:
+            yield stats
+        finally:
+            stats.wall_time = time.time() - wall_start
+            stats.cpu_time = get_cpu_time() - cpu_start
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                stats.peak_memory = peak - base_memory
+                if started_tracing:
+                    tracemalloc.stop()
+            if self.measure_rss:
+                stats.peak_rss = get_max_rss()
+            if stats.tree is not None:
+                stats.nodes = count_nodes(stats.tree)
+                stats.tree = None
+            self.phases.append(stats)
+            if self.callback is not None:
+                self.callback(stats)
+
+    def as_dicts(self):
+        return [stats.as_dict() for stats in self.phases]
+
+    def write_json(self, outfile):
+        json.dump(self.as_dicts(), outfile, indent=2)
+        outfile.write('\n')
+
+    def write_table(self, outfile):
+        outfile.write(
+            '%-10s %10s %10s %12s %14s %10s\n' % (
+                'phase', 'wall (s)', 'cpu (s)', 'peak (KB)', 'peak rss (KB)',
+                'nodes'
+            )
+        )
+        for stats in self.phases:
+            peak = format_kilobytes(stats.peak_memory)
+            peak_rss = format_kilobytes(stats.peak_rss)
+            if stats.nodes is None:
+                nodes = '-'
+            else:
+                nodes = str(stats.nodes)
+            outfile.write(
+                '%-10s %10.4f %10.4f %12s %14s %10s\n' % (
+                    stats.name, stats.wall_time, stats.cpu_time, peak,
+                    peak_rss, nodes
+                )
+            )
+
+def format_kilobytes(size):
+    if size is None:
+        return 'n/a'
+    return '%.1f' % (size / 1024.0)
+
+def compile_profiled(source, profiler, filename=None, rename=False,
+                     locations='full', fold=False):
+    """
+    Minify encoded source bytes as ``minify`` does, measuring the parse,
+    constant folding, rename analysis, rename rewrite and generation phases
+    separately.
+    """
+    from .code_generator import generate_string
+    from .locator_parser import make_string_parser
+    from .rename import analyze_scopes, rename_analyzed_tree
+    with profiler.phase('parse', filename) as stats:
+        ast = make_string_parser(source, filename, locations=locations).parse()
+        stats.tree = ast
+    if fold:
+        from .fold import fold_constants
+        with profiler.phase('fold', filename) as stats:
+            ast = fold_constants(ast)
+            stats.tree = ast
+    nodes = stats.nodes
+    if rename:
+        with profiler.phase('analyze', filename) as stats:
+            analysis = analyze_scopes(ast)
+            stats.nodes = nodes
+        with profiler.phase('rename', filename) as stats:
+            ast = rename_analyzed_tree(analysis)
+            stats.nodes = nodes
+    with profiler.phase('generate', filename) as stats:
+        output = generate_string(ast).encode('utf-8')
+        stats.nodes = nodes
+    return output
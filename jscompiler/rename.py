@@ -2,15 +2,15 @@
 Utilities for renaming locals in scopes to the shortest possible names without
 interfering with the global scope.
 """
-from collections import Counter
+from operator import itemgetter
 
-from bigrig.ast import Name, VariableDeclaration
+from bigrig.ast import FunctionDeclaration, Name, Program, VariableDeclaration
 from bigrig.node import copy_node_attrs
-from bigrig.visitor import NodeTransformer
 
 from .scope_builder import Scope, ScopeBuildingVisitor, ScopeVisitor
 from .name_generator import NameGenerator
 from .utils import build_new_node
+from .visitor import NodeTransformer, NodeVisitor
 
 #
 # ``with`` tracking scope
@@ -20,14 +20,17 @@ class WithTrackingScopeMixin(object):
     """
     Adds a utility to mark ``with`` statement usage in scopes.
     """
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         self.uses_with = False
         super(WithTrackingScopeMixin, self).__init__(*args, **kwargs)
 
     def mark_uses_with(self):
-        self.uses_with = True
-        if self.parent is not None:
-            self.parent.mark_uses_with()
+        scope = self
+        while scope is not None and not scope.uses_with:
+            scope.uses_with = True
+            scope = scope.parent
 
 class WithTrackingScope(WithTrackingScopeMixin, Scope):
     """
@@ -57,8 +60,10 @@ class ReferenceScopeMixin(object):
     """
     Adds reference tracking information to symbols declared in scopes.
     """
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
-        self.reference_counts = Counter()
+        self.reference_counts = {}
         self.references = {}
         super(ReferenceScopeMixin, self).__init__(*args, **kwargs)
 
@@ -66,13 +71,34 @@ class ReferenceScopeMixin(object):
         """
         Mark the name as referenced in this scope and its parents until
         the scope in which it is declared is hit, at which point we do some
-        usage frequency accounting.
+        usage frequency accounting. Returns the declaring scope, or ``None``
+        for undeclared names.
+
+        Every scope on the way records the declaring scope in its
+        ``references`` table, so the walk stops at the first scope that has
+        already seen the name.
         """
-        self.references[name] = self.resolve_name(name)
-        if name in self.declarations:
-            self.reference_counts[name] += 1
-        elif self.parent is not None:
-            self.parent.declare_reference(name)
+        path = []
+        scope = self
+        while scope is not None:
+            if name in scope.references:
+                binding = scope.references[name]
+                break
+            path.append(scope)
+            if name in scope.declarations:
+                binding = scope
+                break
+            scope = scope.parent
+        else:
+            binding = None
+        for scope in path:
+            scope.references[name] = binding
+        if binding is not None:
+            counts = binding.reference_counts
+            if counts is None:
+                counts = binding.reference_counts = {}
+            counts[name] = counts.get(name, 0) + 1
+        return binding
 
 class ReferenceAddingVisitorMixin(object):
     """
@@ -96,6 +122,8 @@ class EvalTrackingScopeMixin(object):
     """
     Adds ``eval`` call tracking to scopes.
     """
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         self._uses_eval = False
         super(EvalTrackingScopeMixin, self).__init__(*args, **kwargs)
@@ -106,7 +134,7 @@ class EvalTrackingScopeMixin(object):
         referenced in this scope or subscopes, but only if the name ``eval``
         has not been redefined in this or any parent scopes.
         """
-        if self.has_declaration('eval') is not None:
+        if self.has_declaration('eval'):
             return False
         return self._uses_eval
 
@@ -114,9 +142,10 @@ class EvalTrackingScopeMixin(object):
         """
         Mark this scope and its parents as referencing the ``eval`` name.
         """
-        self._uses_eval = True
-        if self.parent is not None:
-            self.parent.mark_uses_eval()
+        scope = self
+        while scope is not None and not scope._uses_eval:
+            scope._uses_eval = True
+            scope = scope.parent
 
 class EvalTrackingScope(EvalTrackingScopeMixin, Scope):
     """
@@ -145,9 +174,11 @@ class RenameScopeMixin(object):
     A scope that renames locally defined symbols if ``eval`` is not referenced
     or ``with`` statements are not used in this or any child scope.
     """
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
-        self.original_to_new = {}
-        self.new_to_original = {}
+        self.original_to_new = None
+        self.new_to_original = None
         super(RenameScopeMixin, self).__init__(*args, **kwargs)
 
     def is_protected(self):
@@ -160,30 +191,34 @@ class RenameScopeMixin(object):
     def get_name(self, name):
         """
         Get the new name for a given name or return the given if no new name
-        exists.
+        exists. Referenced names are looked up through the declaring scope
+        recorded by ``declare_reference``.
         """
-        if name in self.original_to_new:
-            return self.original_to_new[name]
-        elif self.parent is not None:
-            return self.parent.get_name(name)
-        return name
+        if name in self.references:
+            scope = self.references[name]
+        else:
+            scope = self.resolve_name(name)
+        if scope is None or not scope.original_to_new:
+            return name
+        return scope.original_to_new.get(name, name)
 
     def build_name_generator(self):
         return NameGenerator()
 
     def resolve_new_name(self, name):
-        if name in self.new_to_original:
-            return self.new_to_original[name]
-        elif self.parent is not None:
-            return self.parent.resolve_new_name(name)
+        scope = self
+        while scope is not None:
+            if scope.new_to_original and name in scope.new_to_original:
+                return scope.new_to_original[name]
+            scope = scope.parent
         return None
 
     def generate_names(self):
         """
         Generates new names for all locally declared symbols.
         """
-        # If we're not allowed to rename, bail
-        if self.is_protected():
+        # If we're not allowed to rename or nothing is referenced, bail
+        if self.is_protected() or not self.reference_counts:
             return
         
         # Let's keep track of the new names for references used in this scope
@@ -194,13 +229,16 @@ class RenameScopeMixin(object):
 
         # Finally, for the locally defined symbols we generate the shortest
         # allowed names in order of usage frequency
-        name_generator = NameGenerator()
-        for name, count in self.reference_counts.most_common():
-            new_name = name_generator.next()
-            while new_name in disallowed:
-                new_name = name_generator.next()
-            self.original_to_new[name] = new_name
-            self.new_to_original[new_name] = name
+        self.original_to_new = original_to_new = {}
+        self.new_to_original = new_to_original = {}
+        name_generator = self.build_name_generator()
+        by_count = sorted(
+            self.reference_counts.items(), key=itemgetter(1), reverse=True
+        )
+        for name, count in by_count:
+            new_name = name_generator.next(disallowed)
+            original_to_new[name] = new_name
+            new_to_original[new_name] = name
 
 
 class RenameScope(
@@ -208,9 +246,24 @@ class RenameScope(
         WithTrackingScopeMixin, Scope
       ):
     """
-    A concrete implementation of a local declaration renaming scope.
+    A concrete implementation of a local declaration renaming scope. Its
+    state lives in slots, and the rename tables and reference counts are only
+    created for scopes that need them.
     """
-    pass
+    __slots__ = (
+        'references', 'reference_counts', 'original_to_new',
+        'new_to_original', 'uses_with', '_uses_eval',
+    )
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.declarations = {}
+        self.references = {}
+        self.reference_counts = None
+        self.original_to_new = None
+        self.new_to_original = None
+        self.uses_with = False
+        self._uses_eval = False
 
 
 class RenameScopeBuildingVisitor(
@@ -277,6 +330,137 @@ class RenameTransformer(NodeTransformer):
     def visit_Parameters(self, node):
         return [self.get_name(name) for name in node]
 
+#
+# Single pass renaming
+#
+
+class RenameAnalysis(object):
+    """
+    The declarations and references of a tree collected by ``RenameAnalyzer``,
+    from which the tree can be renamed in place. Each ``Name`` reference is
+    paired with its declaring scope, or ``None`` if it is undeclared.
+    """
+    def __init__(self, tree, functions, declarations, bindings):
+        self.tree = tree
+        self.functions = functions
+        self.declarations = declarations
+        self.bindings = bindings
+
+    def rename(self):
+        """
+        Generate new names for every function scope, outermost first, then
+        rewrite the changed names in place and return the tree.
+        """
+        functions = self.functions
+        for node in functions:
+            node.scope.generate_names()
+        for binding, node in self.bindings:
+            if binding is not None and binding.original_to_new:
+                name = node.value
+                node.value = binding.original_to_new.get(name, name)
+        for scope, node in self.declarations:
+            node.name = scope.get_name(node.name)
+        for node in functions:
+            scope = node.scope
+            node.parameters = [scope.get_name(name) for name in node.parameters]
+            if isinstance(node, FunctionDeclaration):
+                node.name = scope.parent.get_name(node.name)
+            else:
+                node.name = scope.get_name(node.name)
+        return self.tree
+
+class RenameAnalyzer(NodeVisitor):
+    """
+    Builds rename scopes, declares symbols, tracks ``with`` and ``eval`` usage
+    and collects references in a single walk of the tree. Scopes are attached
+    to the program and function nodes in place instead of rebuilding them.
+    """
+    scope_class = RenameScope
+
+    def __init__(self, scope=None):
+        self.scope = scope or self.scope_class()
+        self.functions = []
+        self.declarations = []
+        self.references = []
+        self.names = {}
+        super(RenameAnalyzer, self).__init__()
+
+    def intern(self, name):
+        """
+        Get the canonical string object for an identifier, so scope tables
+        and nodes share a single copy of each name.
+        """
+        return self.names.setdefault(name, name)
+
+    def analyze(self, ast):
+        """
+        Walk the tree, count the references in each scope and return the
+        ``RenameAnalysis``.
+        """
+        self.visit(ast)
+        bindings = [
+            (scope.declare_reference(node.value), node)
+            for scope, node in self.references
+        ]
+        return RenameAnalysis(
+            ast, self.functions, self.declarations, bindings
+        )
+
+    def push_scope(self, node):
+        self.scope = scope = self.scope_class(self.scope)
+        node.scope = scope
+        return scope
+
+    def pop_scope(self):
+        self.scope = self.scope.parent
+
+    def visit_Program(self, node):
+        self.push_scope(node)
+        self.generic_visit(node)
+        self.pop_scope()
+
+    def visit_FunctionDeclaration(self, node):
+        node.name = name = self.intern(node.name)
+        self.scope.declare_function(name, node)
+        self.visit_function(node)
+
+    def visit_FunctionExpression(self, node):
+        if node.name:
+            node.name = self.intern(node.name)
+        self.visit_function(node, node.name)
+
+    def visit_function(self, node, name=None):
+        """
+        Declare the optional name and the parameters in a new scope for the
+        function node and walk its body.
+        """
+        scope = self.push_scope(node)
+        self.functions.append(node)
+        if name:
+            scope.declare_function(name, node)
+        intern = self.intern
+        node.parameters = parameters = [intern(name) for name in node.parameters]
+        for parameter in parameters:
+            scope.declare_parameter(parameter, node)
+        self.generic_visit(node)
+        self.pop_scope()
+
+    def visit_VariableDeclaration(self, node):
+        self.generic_visit(node)
+        node.name = name = self.intern(node.name)
+        self.scope.declare_variable(name, node.value)
+        self.declarations.append((self.scope, node))
+
+    def visit_WithStatement(self, node):
+        self.scope.mark_uses_with()
+        self.generic_visit(node)
+
+    def visit_Name(self, node):
+        node.value = value = self.intern(node.value)
+        if value == u'eval':
+            self.scope.mark_uses_eval()
+        self.references.append((self.scope, node))
+
 #
 # Utilities
 #
@@ -306,12 +490,44 @@ def rename_scoped_tree(ast):
     new_ast = visitor.visit(ast)
     return new_ast
 
-def rename_locals(ast):
+def analyze_scopes(ast, stats=None):
     """
-    Transform the tree by performing a scoped tree rewriting pass, a reference
-    tracking pass, and finally a tree rewriting pass.
+    Collect the rename scopes, declarations and reference counts of a tree in
+    a single walk, returning a ``RenameAnalysis``. Visits are counted in
+    ``stats`` if a ``VisitStats`` object is given.
     """
-    new_ast = add_rename_scopes(ast)
-    new_ast = add_references(new_ast)
-    new_ast = rename_scoped_tree(new_ast)
-    return new_ast
+    if stats is None:
+        analyzer = RenameAnalyzer()
+    else:
+        from .stats import InstrumentedRenameAnalyzer
+        analyzer = InstrumentedRenameAnalyzer(stats)
+    return analyzer.analyze(ast)
+
+def rename_analyzed_tree(analysis):
+    """
+    Rename the tree of a ``RenameAnalysis`` in place and return it.
+    """
+    return analysis.rename()
+
+def rename_locals(ast, stats=None):
+    """
+    Rename locals to shorter names with one analysis walk followed by an in
+    place rewrite of the names that change. The given tree is modified and
+    returned. Visits of the analysis walk are counted in ``stats`` if a
+    ``VisitStats`` object is given.
+    """
+    return rename_analyzed_tree(analyze_scopes(ast, stats))
+
+def rename_statements(statements):
+    """
+    Rename locals in each of an iterable of top-level statements, yielding the
+    renamed statements. Top-level names are never renamed, but each statement
+    is analyzed without seeing the statements after it. A later top-level
+    declaration named ``eval``, for one, does not reach the earlier ones, so
+    the result can differ from renaming the whole program at once. Use
+    ``rename_locals`` on the whole program where that matters.
+    """
+    for statement in statements:
+        program = rename_locals(Program([statement]))
+        for new_statement in program.statements:
+            yield new_statement
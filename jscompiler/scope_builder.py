@@ -2,11 +2,15 @@
 A base name scope class and utilities for walking and transforming scoped
 abstract syntax trees.
 """
-from collections import OrderedDict
-
 from bigrig import ast
 from bigrig.node import copy_node_attrs
-from bigrig.visitor import NodeTransformer, NodeVisitor
+
+from .visitor import NodeTransformer, NodeVisitor, register_node_class
+
+# Declaration kinds
+FUNCTION = 1
+PARAMETER = 2
+VARIABLE = 3
 
 #
 # Base Scope class
@@ -14,35 +18,43 @@ from bigrig.visitor import NodeTransformer, NodeVisitor
 
 class Scope(object):
     """
-    A function or global name scope.
+    A function or global name scope. Declarations map each declared name to
+    the kind of its latest declaration.
     """
+    __slots__ = ('parent', 'declarations')
+
     def __init__(self, parent=None):
         self.parent = parent
-        self.declarations = OrderedDict()
-        self.function_declarations = OrderedDict()
-        self.parameter_declarations = OrderedDict()
-        self.variable_declarations = OrderedDict()
+        self.declarations = {}
 
-    def declare_symbol(self, name, node):
-        self.declarations[name] = node
+    def declare_symbol(self, name, kind):
+        self.declarations[name] = kind
 
     def declare_function(self, name, node):
-        self.function_declarations[name] = node
-        self.declare_symbol(name, node)
+        self.declarations[name] = FUNCTION
 
     def declare_parameter(self, name, node):
-        self.parameter_declarations[name] = node
-        self.declare_symbol(name, node)
+        self.declarations[name] = PARAMETER
 
     def declare_variable(self, name, node):
-        self.variable_declarations[name] = node
-        self.declare_symbol(name, node)
+        self.declarations[name] = VARIABLE
+
+    def get_declarations(self, kind):
+        """
+        Get the names whose latest declaration in this scope is of the given
+        kind.
+        """
+        return [
+            name for name, declared in self.declarations.items()
+            if declared == kind
+        ]
 
     def resolve_name(self, name):
-        if name in self.declarations:
-            return self
-        elif self.parent is not None:
-            return self.parent.resolve_name(name)
+        scope = self
+        while scope is not None:
+            if name in scope.declarations:
+                return scope
+            scope = scope.parent
         return None
 
     def has_declaration(self, name):
@@ -55,14 +67,17 @@ class Scope(object):
 # Scoped Nodes
 #
 
+@register_node_class
 class FunctionDeclaration(ast.FunctionDeclaration):
     abstract = False
     attributes = ('scope',)
 
+@register_node_class
 class FunctionExpression(ast.FunctionExpression):
     abstract = False
     attributes = ('scope',)
 
+@register_node_class
 class Program(ast.Program):
     abstract = False
     attributes = ('scope',)
@@ -0,0 +1,244 @@
+"""
+A long running compile server on a Unix domain socket, and its client.
+
+Every message is a JSON header line followed by ``length`` bytes of body.
+Requests carry the source as the body and the ``filename``, ``rename``,
+``fold`` and ``locations`` options in the header. Responses carry the output
+as the body with a ``status`` of ``"ok"``, or a ``status`` of ``"error"`` and
+the error ``message`` in the header.
+"""
+import json
+import os
+import socket
+import SocketServer
+import stat
+
+from . import batch
+
+
+class RemoteCompileError(Exception):
+    """
+    Raised by the client when the server could not compile a source.
+    """
+    pass
+
+def read_message(rfile):
+    """
+    Read a header dictionary and body from a file object, or return
+    ``(None, None)`` at the end of the stream.
+    """
+    line = rfile.readline()
+    if not line:
+        return None, None
+    header = json.loads(line)
+    length = header.get('length', 0)
+    body = rfile.read(length)
+    if len(body) != length:
+        raise EOFError('truncated message body')
+    return header, body
+
+def write_message(wfile, header, body=''):
+    header = dict(header, length=len(body))
+    wfile.write(json.dumps(header) + '\n')
+    wfile.write(body)
+    wfile.flush()
+
+def compile_request(request):
+    """
+    Compile one request in a worker process, returning the output and
+    ``None`` or ``None`` and an error message.
+    """
+    from bigrig.parser import ParseException
+    from . import minify
+    source, filename, rename, locations, fold = request
+    tree_cache, output_cache = batch.worker_caches
+    try:
+        return minify(
+            source, filename, rename, locations, tree_cache, output_cache,
+            fold
+        ), None
+    except ParseException, e:
+        return None, str(e)
+    except Exception, e:
+        return None, '%s: %s' % (e.__class__.__name__, e)
+
+def is_socket(path):
+    """
+    Check whether a path names a socket, without following links.
+    """
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except OSError:
+        return False
+
+def is_listening(address):
+    """
+    Check whether a server accepts connections on a socket path.
+    """
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(address)
+    except socket.error:
+        return False
+    finally:
+        probe.close()
+    return True
+
+class CompileRequestHandler(SocketServer.StreamRequestHandler):
+    """
+    Answers every request on a connection by handing it to the worker pool.
+    """
+    def handle(self):
+        while True:
+            try:
+                header, body = read_message(self.rfile)
+            except (ValueError, EOFError), e:
+                write_message(self.wfile, {'status': 'error', 'message': str(e)})
+                return
+            if header is None:
+                return
+            request = (
+                body, header.get('filename'), bool(header.get('rename')),
+                header.get('locations', 'full'), bool(header.get('fold'))
+            )
+            output, error = self.server.pool.apply(compile_request, (request,))
+            if error is None:
+                write_message(self.wfile, {'status': 'ok'}, output)
+            else:
+                write_message(self.wfile, {'status': 'error', 'message': error})
+
+class CompileServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    """
+    Serves compile requests from a pool of warm worker processes sharing one
+    cache directory.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, settings, jobs=None):
+        import multiprocessing
+        if is_socket(address):
+            if is_listening(address):
+                raise ValueError(
+                    'a server is already listening on %s' % address
+                )
+            os.unlink(address)
+        elif os.path.lexists(address):
+            raise ValueError('%s exists and is not a socket' % address)
+        # The pool is only started once the socket is bound, so a failed bind
+        # leaves no worker processes behind
+        self.pool = None
+        SocketServer.UnixStreamServer.__init__(
+            self, address, CompileRequestHandler
+        )
+        try:
+            self.pool = multiprocessing.Pool(
+                jobs, batch.initialize_worker, (settings,)
+            )
+        except:
+            self.server_close()
+            raise
+
+    def server_close(self):
+        SocketServer.UnixStreamServer.server_close(self)
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+        if is_socket(self.server_address):
+            os.unlink(self.server_address)
+
+def serve(address, settings, jobs=None):
+    """
+    Serve compile requests on the given socket path until interrupted. A
+    stale socket at the path is replaced, but any other file is left alone
+    and the server refuses to start.
+    """
+    import sys
+    try:
+        server = CompileServer(address, settings, jobs)
+    except (ValueError, socket.error), e:
+        sys.stderr.write('%s\n' % e)
+        return 1
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+class CompileClient(object):
+    """
+    A connection to a compile server, reusable for many requests.
+    """
+    def __init__(self, address):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(address)
+        self.rfile = self.socket.makefile('rb')
+        self.wfile = self.socket.makefile('wb')
+
+    def compile(self, source, filename=None, rename=False, locations='full',
+                fold=False):
+        """
+        Minify encoded source bytes on the server, returning the UTF-8
+        encoded output.
+        """
+        header = {
+            'filename': filename, 'rename': rename, 'locations': locations,
+            'fold': fold,
+        }
+        write_message(self.wfile, header, source)
+        header, body = read_message(self.rfile)
+        if header is None:
+            raise RemoteCompileError('connection closed by server')
+        if header.get('status') != 'ok':
+            raise RemoteCompileError(header.get('message', ''))
+        return body
+
+    def close(self):
+        self.rfile.close()
+        self.wfile.close()
+        self.socket.close()
+
+def compile_remote(address, source, filename=None, rename=False,
+                   locations='full', fold=False):
+    """
+    Minify encoded source bytes on the server at the given socket path.
+    """
+    client = CompileClient(address)
+    try:
+        return client.compile(source, filename, rename, locations, fold)
+    finally:
+        client.close()
+
+def run_remote(address, options):
+    """
+    Minify the input given by parsed command line options through the server
+    at the given socket path, reporting errors as ``main`` does.
+    """
+    import sys
+    from .locator_parser import read_source
+    input = options.input[0]
+    try:
+        output = compile_remote(
+            address, read_source(input), getattr(input, 'name', None),
+            options.rename, options.locations, options.fold
+        )
+    except RemoteCompileError, e:
+        sys.stderr.write(str(e))
+        return 1
+    except Exception, e:
+        return 1
+    options.output.write(output)
+    return 0
+
+def main_remote(address, argv=None):
+    """
+    A drop-in replacement for ``main`` compiling through the server at the
+    given socket path.
+    """
+    from . import process_args
+    try:
+        options = process_args(argv)
+    except Exception, e:
+        return 1
+    return run_remote(address, options)
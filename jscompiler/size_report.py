@@ -0,0 +1,184 @@
+"""
+Output size measurements after each pass and per function.
+"""
+import gzip
+from collections import namedtuple
+
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from StringIO import StringIO
+
+from .code_generator import StringCodeGenerator
+from .locator_parser import get_location
+
+
+PassSize = namedtuple('PassSize', 'name bytes gzip_bytes')
+
+FunctionSize = namedtuple(
+    'FunctionSize', 'name location depth bytes self_bytes'
+)
+
+def gzip_size(data, level=9):
+    """
+    Get the size of the given bytes once gzip compressed.
+    """
+    buffer = StringIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=level,
+                       mtime=0) as fd:
+        fd.write(data)
+    return len(buffer.getvalue())
+
+class AttributingStringCodeGenerator(StringCodeGenerator):
+    """
+    A string code generator recording the span of the output buffer written
+    for every function declaration and expression.
+    """
+    def __init__(self):
+        super(AttributingStringCodeGenerator, self).__init__()
+        # [node, start index, end index, parent function index, depth]
+        self.functions = []
+        self.function_stack = []
+
+    def visit_function(self, node, visit):
+        stack = self.function_stack
+        parent = stack[-1] if stack else None
+        record = [node, len(self.buffer), None, parent, len(stack)]
+        stack.append(len(self.functions))
+        self.functions.append(record)
+        visit(self, node)
+        stack.pop()
+        record[2] = len(self.buffer)
+
+    def visit_FunctionDeclaration(self, node):
+        self.visit_function(
+            node, StringCodeGenerator.visit_FunctionDeclaration
+        )
+
+    def visit_FunctionExpression(self, node):
+        self.visit_function(
+            node, StringCodeGenerator.visit_FunctionExpression
+        )
+
+    def get_function_sizes(self, locations=None, encoding='utf-8'):
+        """
+        Get a ``FunctionSize`` for every function in output order. Sizes
+        include nested functions, self sizes leave them out.
+        """
+        offsets = [0]
+        total = 0
+        for piece in self.buffer:
+            total += len(piece.encode(encoding))
+            offsets.append(total)
+        sizes = [offsets[end] - offsets[start]
+                 for node, start, end, parent, depth in self.functions]
+        self_sizes = list(sizes)
+        for index, record in enumerate(self.functions):
+            parent = record[3]
+            if parent is not None:
+                self_sizes[parent] -= sizes[index]
+        return [
+            FunctionSize(
+                node.name, get_location(node, locations), depth,
+                sizes[index], self_sizes[index]
+            )
+            for index, (node, start, end, parent, depth)
+            in enumerate(self.functions)
+        ]
+
+class SizeReport(object):
+    """
+    The output size after each pass and the output size of each function.
+    """
+    def __init__(self):
+        self.passes = []
+        self.functions = []
+
+    def add_pass(self, name, output):
+        """
+        Record the size of the encoded output of a pass.
+        """
+        self.passes.append(PassSize(name, len(output), gzip_size(output)))
+
+    def as_dict(self):
+        return {
+            'passes': [size._asdict() for size in self.passes],
+            'functions': [
+                dict(size._asdict(), location=format_location(size.location))
+                for size in self.functions
+            ],
+        }
+
+    def write_table(self, outfile, limit=20):
+        """
+        Write the pass sizes and the largest functions.
+        """
+        outfile.write('%-16s %10s %10s\n' % ('pass', 'bytes', 'gzip'))
+        for size in self.passes:
+            outfile.write(
+                '%-16s %10d %10d\n' % (size.name, size.bytes, size.gzip_bytes)
+            )
+        functions = sorted(
+            self.functions, key=lambda size: size.bytes, reverse=True
+        )
+        outfile.write(
+            '\n%-24s %-12s %6s %10s %10s\n' % (
+                'function', 'location', 'depth', 'bytes', 'self'
+            )
+        )
+        for size in functions[:limit]:
+            outfile.write(
+                '%-24s %-12s %6d %10d %10d\n' % (
+                    (size.name or u'(anonymous)').encode('utf-8'),
+                    format_location(size.location), size.depth, size.bytes,
+                    size.self_bytes
+                )
+            )
+
+def format_location(location):
+    if location is None:
+        return '-'
+    return '%d:%d' % (location.line, location.column)
+
+def generate_output(ast, report, name):
+    """
+    Generate the encoded output of a tree and record its size as a pass.
+    """
+    generator = AttributingStringCodeGenerator()
+    generator.generate(ast)
+    output = generator.get_string().encode('utf-8')
+    report.add_pass(name, output)
+    return generator, output
+
+def report_sizes(source, filename=None, passes=(), locations='full'):
+    """
+    Minify encoded source bytes, running each ``(name, function)`` pass in
+    turn over the tree and recording the output size after the baseline
+    generation and after every pass. Function sizes are attributed from the
+    final output. Returns the output and the ``SizeReport``.
+    """
+    from .locator_parser import make_string_parser
+    report = SizeReport()
+    ast = make_string_parser(source, filename, locations=locations).parse()
+    generator, output = generate_output(ast, report, 'baseline')
+    for name, function in passes:
+        ast = function(ast)
+        generator, output = generate_output(ast, report, name)
+    report.functions = generator.get_function_sizes(
+        getattr(ast, 'locations', None)
+    )
+    return output, report
+
+def get_passes(rename=False, fold=False):
+    """
+    Get the ``(name, function)`` passes enabled by the given options, in the
+    order they run.
+    """
+    passes = []
+    if fold:
+        from .fold import fold_constants
+        passes.append(('fold', fold_constants))
+    if rename:
+        from .rename import rename_locals
+        passes.append(('rename', rename_locals))
+    return passes
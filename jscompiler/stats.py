@@ -0,0 +1,182 @@
+"""
+Opt-in visit, time and token counters for the code generator and the rename
+analyzer.
+
+Pass a ``VisitStats`` object as the ``stats`` argument of ``generate_code``,
+``generate_string`` or ``rename_locals`` to have it filled in. Without one
+the uninstrumented classes are used and nothing is counted.
+"""
+import time
+from collections import Counter
+
+from bigrig import token as t
+
+from .code_generator import CodeGenerator, StringCodeGenerator
+from .rename import RenameAnalyzer
+
+TOKEN_NAMES = dict(
+    (value, name) for name, value in vars(t).items()
+    if name.isupper() and isinstance(value, (int, long))
+)
+
+class VisitStats(object):
+    """
+    Counts of visits and cumulative visit time per node class, tokens
+    reported per token type and nodes marked for parentheses. Visit times
+    include the time spent visiting children.
+    """
+    def __init__(self):
+        self.visits = Counter()
+        self.times = Counter()
+        self.tokens = Counter()
+        self.parens_marks = 0
+
+    def as_dict(self):
+        return {
+            'visits': dict(self.visits),
+            'times': dict(self.times),
+            'tokens': dict(
+                (TOKEN_NAMES.get(type, str(type)), count)
+                for type, count in self.tokens.items()
+            ),
+            'parens_marks': self.parens_marks,
+        }
+
+    def write_table(self, outfile, limit=20):
+        """
+        Write the most visited node classes and most reported token types.
+        """
+        outfile.write('%-28s %10s %12s\n' % ('node', 'visits', 'time (s)'))
+        for name, count in self.visits.most_common(limit):
+            outfile.write(
+                '%-28s %10d %12.4f\n' % (name, count, self.times[name])
+            )
+        outfile.write('\n%-28s %10s\n' % ('token', 'count'))
+        for type, count in self.tokens.most_common(limit):
+            name = TOKEN_NAMES.get(type, str(type))
+            outfile.write('%-28s %10d\n' % (name, count))
+        outfile.write('\nmarked for parentheses: %d\n' % self.parens_marks)
+
+class InstrumentedVisitorMixin(object):
+    """
+    Records every visit and its cumulative time in ``self.stats``. The links
+    of a left-nested chain below its top are finished without a visit of
+    their own and are not counted.
+    """
+    def visit(self, node):
+        name = node.__class__.__name__
+        start = time.time()
+        try:
+            return super(InstrumentedVisitorMixin, self).visit(node)
+        finally:
+            stats = self.stats
+            stats.visits[name] += 1
+            stats.times[name] += time.time() - start
+
+class CountingConsumer(object):
+    """
+    A token consumer proxy counting reported tokens by type before passing
+    them on to another consumer, if there is one.
+    """
+    def __init__(self, consumer, stats):
+        self.consumer = consumer
+        self.stats = stats
+
+    def count(self, token):
+        self.stats.tokens[token.type] += 1
+        return self.consumer
+
+    def report_token(self, token):
+        consumer = self.count(token)
+        if consumer:
+            consumer.report_token(token)
+
+    def report_number(self, token):
+        consumer = self.count(token)
+        if consumer:
+            consumer.report_number(token)
+
+    def report_keyword(self, token):
+        consumer = self.count(token)
+        if consumer:
+            consumer.report_keyword(token)
+
+    def report_literal(self, token):
+        consumer = self.count(token)
+        if consumer:
+            consumer.report_literal(token)
+
+    def report_identifier(self, token):
+        consumer = self.count(token)
+        if consumer:
+            consumer.report_identifier(token)
+
+    def report_binary_op(self, token):
+        consumer = self.count(token)
+        if consumer:
+            consumer.report_binary_op(token)
+
+    def report_unary_op(self, token):
+        consumer = self.count(token)
+        if consumer:
+            consumer.report_unary_op(token)
+
+    def report_prefix_op(self, token):
+        consumer = self.count(token)
+        if consumer:
+            consumer.report_prefix_op(token)
+
+    def report_postfix_op(self, token):
+        consumer = self.count(token)
+        if consumer:
+            consumer.report_postfix_op(token)
+
+    def report_regexp(self, token):
+        consumer = self.count(token)
+        if consumer:
+            consumer.report_regexp(token)
+
+class InstrumentedCodeGenerator(InstrumentedVisitorMixin, CodeGenerator):
+    """
+    A ``CodeGenerator`` filling in a ``VisitStats`` object.
+    """
+    def __init__(self, consumer, stats):
+        self.stats = stats
+        super(InstrumentedCodeGenerator, self).__init__(
+            CountingConsumer(consumer, stats)
+        )
+
+    def mark_for_parens(self, node):
+        self.stats.parens_marks += 1
+        super(InstrumentedCodeGenerator, self).mark_for_parens(node)
+
+class InstrumentedStringCodeGenerator(InstrumentedVisitorMixin,
+                                      StringCodeGenerator):
+    """
+    A ``StringCodeGenerator`` filling in a ``VisitStats`` object.
+    """
+    def __init__(self, stats):
+        self.stats = stats
+        super(InstrumentedStringCodeGenerator, self).__init__()
+
+    def report_token(self, type, value):
+        self.stats.tokens[type] += 1
+        super(InstrumentedStringCodeGenerator, self).report_token(type, value)
+
+    def report_spaced_token(self, type, value):
+        self.stats.tokens[type] += 1
+        super(InstrumentedStringCodeGenerator, self).report_spaced_token(
+            type, value
+        )
+
+    def mark_for_parens(self, node):
+        self.stats.parens_marks += 1
+        super(InstrumentedStringCodeGenerator, self).mark_for_parens(node)
+
+class InstrumentedRenameAnalyzer(InstrumentedVisitorMixin, RenameAnalyzer):
+    """
+    A ``RenameAnalyzer`` filling in a ``VisitStats`` object.
+    """
+    def __init__(self, stats, scope=None):
+        self.stats = stats
+        super(InstrumentedRenameAnalyzer, self).__init__(scope)
@@ -0,0 +1,41 @@
+"""
+Shared, immutable tokens for token types whose value never changes.
+"""
+from bigrig import token as t
+
+class SharedToken(t.Token):
+    """
+    A token shared between every report of the same punctuator, keyword or
+    operator. Shared tokens can't be modified, and since there is only one
+    per type and value, consumers may compare them by identity.
+    """
+    frozen = False
+
+    def __setattr__(self, name, value):
+        if self.frozen:
+            raise AttributeError('shared tokens are immutable')
+        super(SharedToken, self).__setattr__(name, value)
+
+SHARED_TOKENS = {}
+
+def get_shared_token(type, value):
+    """
+    Get the single shared token for a type and value.
+    """
+    key = (type, value)
+    token = SHARED_TOKENS.get(key)
+    if token is None:
+        token = SharedToken(type, value)
+        token.frozen = True
+        SHARED_TOKENS[key] = token
+    return token
+
+def build_token_table(value_to_type):
+    """
+    Build a table mapping token values to shared tokens from a table mapping
+    token values to types.
+    """
+    return dict(
+        (value, get_shared_token(type, value))
+        for value, type in value_to_type.items()
+    )
@@ -0,0 +1,81 @@
+"""
+Tree visitors that dispatch through precomputed per-class method tables.
+"""
+from bigrig import ast
+from bigrig import visitor
+from bigrig.node import Node
+
+# Node classes whose dispatch entries are resolved up front
+NODE_CLASSES = [
+    value for value in vars(ast).values()
+    if isinstance(value, type) and issubclass(value, Node)
+]
+
+DISPATCH_TABLES = {}
+
+def register_node_class(cls):
+    """
+    A class decorator adding a node class to the classes resolved up front
+    when a visitor class first builds its dispatch table.
+    """
+    NODE_CLASSES.append(cls)
+    return cls
+
+def resolve_visit_method(visitor_class, node_class):
+    """
+    Find the plain function handling a node class for a visitor class, which
+    is its ``generic_visit`` if there is no ``visit_`` method for the class.
+    """
+    method = getattr(visitor_class, 'visit_' + node_class.__name__, None)
+    if method is None:
+        method = visitor_class.generic_visit
+    return getattr(method, '__func__', method)
+
+def get_dispatch_table(visitor_class):
+    """
+    Get the table mapping node classes to visit functions for a visitor class,
+    building it on first use.
+    """
+    table = DISPATCH_TABLES.get(visitor_class)
+    if table is None:
+        table = DISPATCH_TABLES[visitor_class] = {}
+        for node_class in NODE_CLASSES:
+            table[node_class] = resolve_visit_method(visitor_class, node_class)
+    return table
+
+class DispatchTableMixin(object):
+    """
+    Replaces the name based method lookup of the ``bigrig`` visitors with one
+    dictionary lookup per visit. Classes without a ``visit_`` method of their
+    own, such as lists of unhandled nodes, map straight to ``generic_visit``.
+    """
+    def __init__(self, *args, **kwargs):
+        self.dispatch_table = get_dispatch_table(self.__class__)
+        super(DispatchTableMixin, self).__init__(*args, **kwargs)
+
+    def visit(self, node):
+        method = self.dispatch_table.get(node.__class__)
+        if method is None:
+            method = self.add_dispatch(node.__class__)
+        return method(self, node)
+
+    def add_dispatch(self, node_class):
+        """
+        Resolve and store the table entry for a node class seen for the first
+        time.
+        """
+        method = resolve_visit_method(self.__class__, node_class)
+        self.dispatch_table[node_class] = method
+        return method
+
+class NodeVisitor(DispatchTableMixin, visitor.NodeVisitor):
+    """
+    A table dispatching ``NodeVisitor``.
+    """
+    pass
+
+class NodeTransformer(DispatchTableMixin, visitor.NodeTransformer):
+    """
+    A table dispatching ``NodeTransformer``.
+    """
+    pass
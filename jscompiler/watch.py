@@ -0,0 +1,188 @@
+"""
+Watch a directory and recompile only the files that change.
+
+Changes are picked up from inotify events when ``pyinotify`` is installed and
+by polling modification times otherwise.
+"""
+import fnmatch
+import os
+import sys
+import time
+
+from .batch import write_output
+
+
+def get_stamp(path):
+    """
+    Get the modification time and size of a file, or ``None`` if it is gone.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+class Watcher(object):
+    """
+    Keeps the compiled output of every source in a directory up to date in an
+    output directory. A file is only parsed again when its stamp changes.
+    """
+    def __init__(self, directory, output_dir, rename=False, locations='full',
+                 fold=False, pattern='*.js', errors=sys.stderr):
+        self.directory = os.path.abspath(directory)
+        self.output_dir = os.path.abspath(output_dir)
+        self.rename = rename
+        self.locations = locations
+        self.fold = fold
+        self.pattern = pattern
+        self.errors = errors
+        # path -> last seen stamp
+        self.stamps = {}
+
+    def is_source(self, path):
+        path = os.path.abspath(path)
+        if path.startswith(self.output_dir + os.sep):
+            return False
+        return fnmatch.fnmatch(os.path.basename(path), self.pattern)
+
+    def get_output_path(self, path):
+        return os.path.join(
+            self.output_dir, os.path.relpath(path, self.directory)
+        )
+
+    def iter_sources(self):
+        for directory, subdirectories, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                if self.is_source(path):
+                    yield path
+
+    def compile(self, path):
+        """
+        Parse, fold, rename and generate one source, returning its encoded
+        output.
+        """
+        from . import parse_source, rename_ast
+        from .code_generator import generate_string
+        from .locator_parser import read_source
+        with open(path, 'rb') as fd:
+            source = read_source(fd)
+        if self.fold:
+            from .fold import fold_constants
+            tree = fold_constants(parse_source(source, path, self.locations))
+            if self.rename:
+                tree = rename_ast(tree)
+        else:
+            tree = parse_source(
+                source, path, self.locations, scoped=self.rename
+            )
+            if self.rename:
+                tree = rename_ast(tree, scoped=True)
+        return generate_string(tree).encode('utf-8')
+
+    def changed(self, path):
+        """
+        Rebuild a source if its stamp changed since it was last seen, or
+        forget it and its output if it was removed. Returns whether anything
+        was done. Errors are reported and leave the watch running.
+        """
+        from bigrig.parser import ParseException
+        path = os.path.abspath(path)
+        stamp = get_stamp(path)
+        last_stamp = self.stamps.get(path)
+        if stamp is None:
+            if last_stamp is None:
+                return False
+            del self.stamps[path]
+            try:
+                os.unlink(self.get_output_path(path))
+            except OSError:
+                pass
+            return True
+        if last_stamp == stamp:
+            return False
+        self.stamps[path] = stamp
+        start = time.time()
+        try:
+            write_output(self.get_output_path(path), self.compile(path))
+        except ParseException, e:
+            self.errors.write('%s: %s\n' % (path, e))
+            return True
+        except EnvironmentError, e:
+            self.errors.write('%s: %s\n' % (path, e))
+            return True
+        except Exception, e:
+            self.errors.write(
+                '%s: %s: %s\n' % (path, e.__class__.__name__, e)
+            )
+            return True
+        self.errors.write(
+            'Rebuilt %s in %.3fs\n' % (
+                os.path.relpath(path, self.directory), time.time() - start
+            )
+        )
+        return True
+
+    def poll(self):
+        """
+        Check every watched source and rebuild the ones that changed,
+        returning how many were rebuilt or removed.
+        """
+        paths = set(self.iter_sources())
+        paths.update(self.stamps)
+        return len([path for path in paths if self.changed(path)])
+
+    def watch_polling(self, interval=0.5):
+        while True:
+            self.poll()
+            time.sleep(interval)
+
+    def watch_inotify(self):
+        import pyinotify
+        self.poll()
+        manager = pyinotify.WatchManager()
+        mask = (
+            pyinotify.IN_CLOSE_WRITE | pyinotify.IN_MOVED_TO |
+            pyinotify.IN_MOVED_FROM | pyinotify.IN_DELETE
+        )
+        manager.add_watch(self.directory, mask, rec=True, auto_add=True)
+        notifier = pyinotify.Notifier(manager, make_event_handler(self))
+        notifier.loop()
+
+    def watch(self, interval=0.5):
+        """
+        Build every source, then rebuild changed sources until interrupted.
+        """
+        try:
+            import pyinotify
+        except ImportError:
+            pyinotify = None
+        try:
+            if pyinotify is None:
+                self.watch_polling(interval)
+            else:
+                self.watch_inotify()
+        except KeyboardInterrupt:
+            pass
+
+def make_event_handler(watcher):
+    """
+    Make a ``pyinotify`` event handler that passes changed sources to the
+    given watcher.
+    """
+    import pyinotify
+
+    class EventHandler(pyinotify.ProcessEvent):
+        def process_default(self, event):
+            if not event.dir and watcher.is_source(event.pathname):
+                watcher.changed(event.pathname)
+
+    return EventHandler()
+
+def watch(directory, output_dir, rename=False, locations='full', fold=False,
+          interval=0.5):
+    """
+    Keep the output directory up to date with the sources in a directory.
+    """
+    watcher = Watcher(directory, output_dir, rename, locations, fold)
+    watcher.watch(interval)
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from jscompiler.batch import (
+    expand_inputs, get_common_directory, get_output_paths
+)
+
+
+class GetOutputPathsTestCase(unittest.TestCase):
+    def test_common_directory_compares_components(self):
+        self.assertEqual(
+            get_common_directory(['/src/lib', '/src/lib2']), '/src'
+        )
+        self.assertEqual(get_common_directory(['/lib', '/lib2']), '/')
+
+    def test_sibling_directories_sharing_a_prefix(self):
+        paths = [
+            os.path.join('project', 'lib', 'a.js'),
+            os.path.join('project', 'lib2', 'b.js'),
+        ]
+        self.assertEqual(
+            get_output_paths(paths, 'build'),
+            [
+                os.path.join('build', 'lib', 'a.js'),
+                os.path.join('build', 'lib2', 'b.js'),
+            ]
+        )
+
+    def test_single_file(self):
+        self.assertEqual(
+            get_output_paths([os.path.join('lib', 'a.js')], 'build'),
+            [os.path.join('build', 'a.js')]
+        )
+
+    def test_output_inside_output_dir(self):
+        output_dir = os.path.abspath('build')
+        for path in get_output_paths(['lib/a.js', 'lib2/b.js'], output_dir):
+            self.assertTrue(path.startswith(output_dir + os.sep))
+
+
+class ExpandInputsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ('a.js', 'b.js'):
+            open(os.path.join(self.directory, name), 'wb').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_duplicates_are_dropped(self):
+        a = os.path.join(self.directory, 'a.js')
+        b = os.path.join(self.directory, 'b.js')
+        paths = expand_inputs([
+            a, os.path.join(self.directory, '.', 'a.js'),
+            os.path.join(self.directory, '*.js'),
+        ])
+        self.assertEqual(paths, [a, b])
+        self.assertEqual(len(set(get_output_paths(paths, 'build'))), 2)
+
+    def test_manifest_duplicates_are_dropped(self):
+        a = os.path.join(self.directory, 'a.js')
+        manifest = os.path.join(self.directory, 'manifest')
+        with open(manifest, 'wb') as fd:
+            fd.write('%s\n%s\n' % (a, a))
+        self.assertEqual(expand_inputs([a], manifest), [a])
+
+
+if __name__ == '__main__':
+    unittest.main()
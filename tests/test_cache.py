@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from jscompiler import cache
+from jscompiler.cache import (
+    FileCache, check_cache_directory, hash_source
+)
+
+
+class HashSourceTestCase(unittest.TestCase):
+    def test_format_changes_key(self):
+        key = hash_source('source', u'tree')
+        format = cache.CACHE_FORMAT
+        cache.CACHE_FORMAT = format + 1
+        try:
+            self.assertNotEqual(hash_source('source', u'tree'), key)
+        finally:
+            cache.CACHE_FORMAT = format
+
+
+class CheckCacheDirectoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_creates_private_directory(self):
+        path = os.path.join(self.directory, 'cache')
+        check_cache_directory(path)
+        self.assertEqual(os.stat(path).st_mode & 0777, 0700)
+
+    def test_refuses_shared_directory(self):
+        os.chmod(self.directory, 0777)
+        self.assertRaises(ValueError, check_cache_directory, self.directory)
+
+
+class FileCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_set(self):
+        files = FileCache(self.directory)
+        self.assertEqual(files.get('abcdef'), None)
+        files.set('abcdef', 'data')
+        self.assertEqual(files.get('abcdef'), 'data')
+
+    def test_first_store_scans_stale_directory(self):
+        files = FileCache(self.directory, 1024)
+        scans = []
+        evict = files.evict
+        files.evict = lambda: scans.append(1) or evict()
+        files.set('aa01', 'x' * 10)
+        self.assertEqual(scans, [1])
+        files.set('aa02', 'x' * 10)
+        self.assertEqual(scans, [1])
+        files.set('aa03', 'x' * 100)
+        self.assertEqual(scans, [1, 1])
+
+    def test_short_lived_processes_evict(self):
+        for index in range(20):
+            marker = os.path.join(self.directory, cache.EVICT_MARKER)
+            if os.path.exists(marker):
+                os.utime(marker, (0, 0))
+            FileCache(self.directory, 1024).set('aa%02d' % index, 'x' * 100)
+        files = FileCache(self.directory, 1024)
+        size = sum(entry[1] for entry in files.iter_entries())
+        self.assertTrue(size <= 1024)
+
+    def test_recent_scan_not_repeated(self):
+        FileCache(self.directory, 1024).set('aa01', 'x' * 10)
+        files = FileCache(self.directory, 1024)
+        scans = []
+        files.evict = lambda: scans.append(1)
+        files.set('aa02', 'x' * 10)
+        self.assertEqual(scans, [])
+
+    def test_evicts_to_limit(self):
+        files = FileCache(self.directory, 1024)
+        for index in range(20):
+            files.set('aa%02d' % index, 'x' * 100)
+        files.evict()
+        size = sum(entry[1] for entry in files.iter_entries())
+        self.assertTrue(size <= 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
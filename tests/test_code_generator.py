@@ -0,0 +1,48 @@
+import unittest
+
+from jscompiler.code_consumer import print_string
+from jscompiler.code_generator import generate_string
+from jscompiler.locator_parser import NO_LOCATIONS, parse_string
+
+SOURCES = [
+    u'var a = b + +c, d = e - -f, g = h + ++i, j = k - --l;',
+    u'a++ + b; c-- - d; e = f++ + +g;',
+    u'if (typeof x === "undefined") { return void 0 }',
+    u'function f(a) { return a in b && a instanceof C }',
+    u'var r = /ab+c/g.test(s), q = a / b / c;',
+    u'do x(); while (y); for (var k in o) delete o[k];',
+    u'var s = "\\u00e9t\\u00e9", n = 1.5e3, o = {a: 1, "b c": [1, , 2]};',
+    u'x = (function () { return this })(), y = new (f())(), z = -(-1);',
+]
+
+
+class StringCodeGeneratorTestCase(unittest.TestCase):
+    def test_matches_print_consumer(self):
+        for source in SOURCES:
+            ast = parse_string(source)
+            self.assertEqual(
+                generate_string(ast).encode('utf-8'), print_string(ast)
+            )
+
+
+class LeftChainTestCase(unittest.TestCase):
+    def generate(self, source):
+        return generate_string(parse_string(source, locations=NO_LOCATIONS))
+
+    def test_parenthesization(self):
+        for source in [
+                u'(a+b)*c', u'a*b+c', u'a-(b-c)', u'a-b-c', u'(a,b).c',
+                u'(a+b).c()', u'a.b().c.d()', u'(a=b)+c', u'a[b+c](d)']:
+            self.assertEqual(self.generate(source), source)
+
+    def test_redundant_parens_are_dropped(self):
+        self.assertEqual(self.generate(u'((a+b)+c)*d'), u'(a+b+c)*d')
+        self.assertEqual(self.generate(u'(a.b)().c'), u'a.b().c')
+
+    def test_long_chains(self):
+        for source in [u'a' + u'+a' * 5000, u'a' + u'.b()' * 5000]:
+            self.assertEqual(self.generate(source), source)
+
+
+if __name__ == '__main__':
+    unittest.main()
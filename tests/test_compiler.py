@@ -0,0 +1,30 @@
+import unittest
+
+from jscompiler import minify
+from jscompiler.compiler import Compiler
+
+SOURCE = u'var count=0;function bump(step){count+=step;return count}'
+
+
+class CompilerTestCase(unittest.TestCase):
+    def test_rename_with_top_level_references(self):
+        output = Compiler(rename=True).compile(SOURCE)
+        self.assertEqual(
+            output, u'var count=0;function bump(a){count+=a;return count}'
+        )
+
+    def test_matches_minify(self):
+        for rename in (False, True):
+            for fold in (False, True):
+                output = Compiler(rename=rename, fold=fold).compile(SOURCE)
+                expected = minify(
+                    SOURCE.encode('utf-8'), rename=rename, fold=fold
+                )
+                self.assertEqual(output.encode('utf-8'), expected)
+
+    def test_unknown_locations_mode(self):
+        self.assertRaises(ValueError, Compiler, locations='partial')
+
+
+if __name__ == '__main__':
+    unittest.main()
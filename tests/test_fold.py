@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import math
+import unittest
+
+from jscompiler.compiler import Compiler
+from jscompiler.fold import (
+    INFINITY, NAN, divide, make_literal, number_to_string, parse_number,
+    string_to_number, to_int32, to_string, to_uint32
+)
+
+
+def fold(source):
+    return Compiler(fold=True).compile(source)
+
+
+class NumberToStringTestCase(unittest.TestCase):
+    def test_integers(self):
+        self.assertEqual(number_to_string(0.0), u'0')
+        self.assertEqual(number_to_string(123.0), u'123')
+        self.assertEqual(number_to_string(-42.0), u'-42')
+        self.assertEqual(number_to_string(1e20), u'100000000000000000000')
+
+    def test_fractions(self):
+        self.assertEqual(number_to_string(1.5), u'1.5')
+        self.assertEqual(number_to_string(0.1 + 0.2), u'0.30000000000000004')
+        self.assertEqual(number_to_string(0.000001), u'0.000001')
+
+    def test_exponents(self):
+        self.assertEqual(number_to_string(1e21), u'1e+21')
+        self.assertEqual(number_to_string(1.5e300), u'1.5e+300')
+        self.assertEqual(number_to_string(1e-7), u'1e-7')
+        self.assertEqual(number_to_string(1.25e-7), u'1.25e-7')
+
+    def test_special_values(self):
+        self.assertEqual(number_to_string(NAN), u'NaN')
+        self.assertEqual(number_to_string(INFINITY), u'Infinity')
+        self.assertEqual(number_to_string(-INFINITY), u'-Infinity')
+
+
+class NegativeZeroTestCase(unittest.TestCase):
+    def test_to_string(self):
+        self.assertEqual(to_string(-0.0), u'0')
+
+    def test_division_keeps_sign(self):
+        self.assertEqual(divide(1.0, -0.0), -INFINITY)
+        self.assertEqual(divide(-1.0, 0.0), -INFINITY)
+        self.assertEqual(divide(1.0, 0.0), INFINITY)
+
+    def test_literal_keeps_sign(self):
+        self.assertEqual(fold(u'x=-0*1;'), u'x=-0')
+        self.assertEqual(fold(u'x=1/-0;'), u'x=1/-0')
+
+
+class NaNTestCase(unittest.TestCase):
+    def test_conversions(self):
+        self.assertTrue(math.isnan(string_to_number(u'abc')))
+        self.assertTrue(math.isnan(string_to_number(u'1e')))
+        self.assertTrue(math.isnan(divide(0.0, 0.0)))
+
+    def test_not_folded_to_a_literal(self):
+        self.assertEqual(make_literal(NAN), None)
+        self.assertEqual(fold(u'x=0/0;'), u'x=0/0')
+
+    def test_comparisons_are_false(self):
+        self.assertEqual(fold(u'x=0/0==0/0;'), u'x=!1')
+        self.assertEqual(fold(u'x=0/0<1;'), u'x=!1')
+
+
+class Int32TestCase(unittest.TestCase):
+    def test_to_int32(self):
+        self.assertEqual(to_int32(2.0 ** 31), -2 ** 31)
+        self.assertEqual(to_int32(2.0 ** 32 + 5), 5)
+        self.assertEqual(to_int32(-1.5), -1)
+        self.assertEqual(to_int32(NAN), 0)
+        self.assertEqual(to_int32(INFINITY), 0)
+
+    def test_to_uint32(self):
+        self.assertEqual(to_uint32(-1.0), 2 ** 32 - 1)
+        self.assertEqual(to_uint32(2.0 ** 32), 0)
+
+    def test_operators(self):
+        self.assertEqual(fold(u'x=4294967297|0;'), u'x=1')
+        self.assertEqual(fold(u'x=3000000000>>0;'), u'x=-1294967296')
+        self.assertEqual(fold(u'x=-1>>>28;'), u'x=15')
+        self.assertEqual(fold(u'x=~0;'), u'x=-1')
+
+
+class HexOverflowTestCase(unittest.TestCase):
+    def test_string_to_number(self):
+        self.assertEqual(string_to_number(u'0x' + u'f' * 300), INFINITY)
+
+    def test_parse_number(self):
+        self.assertEqual(parse_number(u'0x' + u'F' * 300), INFINITY)
+        self.assertEqual(parse_number(u'0x10'), 16.0)
+
+    def test_compiles(self):
+        source = u'x=0x%s' % (u'f' * 300)
+        self.assertEqual(fold(source + u';'), source)
+
+
+class DirectiveTestCase(unittest.TestCase):
+    def test_program_prologue(self):
+        self.assertEqual(fold(u'"use "+"strict";'), u'"use "+"strict"')
+
+    def test_function_prologue(self):
+        self.assertEqual(
+            fold(u'function f(){"use "+"strict";return 1}'),
+            u'function f(){"use "+"strict";return 1}'
+        )
+
+    def test_nested_strings_still_fold(self):
+        self.assertEqual(fold(u'x="use "+"strict";'), u'x="use strict"')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from jscompiler.locator_parser import (
+    COMPACT_LOCATIONS, FULL_LOCATIONS, NO_LOCATIONS, LocationTable,
+    LocatorParser, get_location, locate_nodes, parse_string, wrap_parse_method
+)
+
+SOURCE = 'var a = 1;\nfunction f(b) {\n  return a + b;\n}\nf(2);'
+
+
+class DummyParser(object):
+    def parse_thing(self):
+        return None
+
+    def helper(self):
+        return None
+
+
+class LocateNodesTestCase(unittest.TestCase):
+    def test_wraps_parse_methods_only(self):
+        cls = locate_nodes(type('Parser', (DummyParser,), {}))
+        self.assertTrue(cls.parse_thing.locates_nodes)
+        self.assertFalse(hasattr(cls.helper, 'locates_nodes'))
+
+    def test_wraps_once(self):
+        cls = locate_nodes(type('Parser', (DummyParser,), {}))
+        wrapped = cls.__dict__['parse_thing']
+        locate_nodes(cls, wrap_parse_method)
+        self.assertTrue(cls.__dict__['parse_thing'] is wrapped)
+
+    def test_every_parser_method_locates(self):
+        names = [name for name in dir(LocatorParser)
+                 if name.startswith('parse_')]
+        self.assertTrue(names)
+        for name in names:
+            method = getattr(LocatorParser, name)
+            if callable(method):
+                self.assertTrue(getattr(method, 'locates_nodes', False), name)
+
+    def test_nodes_get_locators(self):
+        program = parse_string('var a = 1;\nfoo(a);')
+        first, second = program.statements
+        self.assertTrue(first.locator.line < second.locator.line)
+        self.assertEqual(
+            second.expression.locator.line, second.locator.line
+        )
+
+
+class LocationModesTestCase(unittest.TestCase):
+    def test_compact_matches_full(self):
+        full = parse_string(SOURCE, 'test.js', locations=FULL_LOCATIONS)
+        compact = parse_string(
+            SOURCE, 'test.js', locations=COMPACT_LOCATIONS
+        )
+        self.assertEqual(compact.locations.filename, 'test.js')
+        for full_node, compact_node in zip(
+                full.statements, compact.statements):
+            self.assertFalse(hasattr(compact_node, 'locator'))
+            expected = get_location(full_node)
+            location = get_location(compact_node, compact.locations)
+            self.assertEqual(
+                (location.line, location.column),
+                (expected.line, expected.column)
+            )
+
+    def test_no_locations(self):
+        program = parse_string(SOURCE, locations=NO_LOCATIONS)
+        for node in program.statements:
+            self.assertEqual(get_location(node), None)
+            self.assertFalse(hasattr(node, 'position'))
+
+    def test_compact_needs_table(self):
+        program = parse_string(SOURCE, locations=COMPACT_LOCATIONS)
+        node = program.statements[1]
+        self.assertEqual(get_location(node), None)
+        self.assertTrue(get_location(node, program.locations) is not None)
+
+    def test_location_table_unpacks(self):
+        table = LocationTable('a.js')
+        location = table.unpack((3 << 32) | 7)
+        self.assertEqual(tuple(location), ('a.js', 3, 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
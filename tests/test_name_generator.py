@@ -0,0 +1,46 @@
+import unittest
+
+from jscompiler.name_generator import (
+    DISALLOWED_NAMES, NameGenerator, index_of, name_at
+)
+
+
+class NameGeneratorTestCase(unittest.TestCase):
+    def test_index_of_inverts_name_at(self):
+        for index in range(0, 300000, 13):
+            self.assertEqual(index_of(name_at(index)), index)
+        self.assertEqual(index_of(u'1a'), None)
+
+    def test_matches_filtering_every_name(self):
+        generator = NameGenerator()
+        names = [generator.next() for i in range(10000)]
+        expected = []
+        index = 0
+        while len(expected) < len(names):
+            name = name_at(index)
+            index += 1
+            if name not in DISALLOWED_NAMES:
+                expected.append(name)
+        self.assertEqual(names, expected)
+
+    def test_no_reserved_words(self):
+        generator = NameGenerator()
+        for i in range(50000):
+            self.assertFalse(generator.next() in DISALLOWED_NAMES)
+
+    def test_extra_disallowed_names(self):
+        generator = NameGenerator()
+        self.assertEqual(
+            [generator.next(set([u'a', u'b'])) for i in range(3)],
+            [u'c', u'd', u'e']
+        )
+
+    def test_custom_disallowed_names(self):
+        generator = NameGenerator(disallowed=frozenset([u'a', u'c']))
+        self.assertEqual(
+            [generator.next() for i in range(3)], [u'b', u'd', u'e']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+from jscompiler.code_generator import generate_string
+from jscompiler.locator_parser import parse_string
+from jscompiler.rename import (
+    add_references, add_rename_scopes, rename_locals, rename_scoped_tree
+)
+
+SOURCES = [
+    'var x=1;function f(longname){return longname+x}',
+    'var total=0;function add(value){total+=value;return total}',
+    'function outer(first){var second=first*2;'
+    'return function(third){return first+second+third}}',
+    'function f(object,longname){with(object){return longname}}',
+    'var a=function named(count){return count?named(count-1):0};',
+]
+
+
+def rename(source):
+    return generate_string(rename_locals(parse_string(source)))
+
+
+def rename_three_pass(source):
+    ast = add_references(add_rename_scopes(parse_string(source)))
+    return generate_string(rename_scoped_tree(ast))
+
+
+class RenameLocalsTestCase(unittest.TestCase):
+    def test_reference_to_program_scope(self):
+        self.assertEqual(
+            rename(SOURCES[0]), u'var x=1;function f(a){return a+x}'
+        )
+
+    def test_top_level_names_kept(self):
+        output = rename(SOURCES[1])
+        self.assertTrue(u'total' in output)
+        self.assertTrue(u'function add(' in output)
+        self.assertFalse(u'value' in output)
+
+    def test_closure_references_renamed(self):
+        output = rename(SOURCES[2])
+        for name in (u'first', u'second', u'third'):
+            self.assertFalse(name in output)
+
+    def test_with_protects_scope(self):
+        output = rename(SOURCES[3])
+        self.assertTrue(u'longname' in output)
+        self.assertTrue(u'object' in output)
+
+    def test_eval_protects_scope(self):
+        output = rename('function f(longname){return eval("longname")}')
+        self.assertTrue(u'(longname)' in output)
+
+    def test_declared_eval_does_not_protect(self):
+        output = rename(
+            'function f(longname){var eval;return eval(longname)}'
+        )
+        self.assertFalse(u'longname' in output)
+
+    def test_matches_three_pass_pipeline(self):
+        for source in SOURCES:
+            self.assertEqual(rename(source), rename_three_pass(source))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+from jscompiler.server import CompileServer, is_listening, is_socket
+
+
+class SocketPathTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'socket')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_is_socket(self):
+        self.assertFalse(is_socket(self.path))
+        with open(self.path, 'wb') as fd:
+            fd.write('data')
+        self.assertFalse(is_socket(self.path))
+        os.unlink(self.path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(self.path)
+            self.assertTrue(is_socket(self.path))
+        finally:
+            listener.close()
+
+    def test_refuses_to_replace_a_file(self):
+        with open(self.path, 'wb') as fd:
+            fd.write('data')
+        self.assertRaises(ValueError, CompileServer, self.path, {}, 1)
+        with open(self.path, 'rb') as fd:
+            self.assertEqual(fd.read(), 'data')
+
+    def test_refuses_to_replace_a_live_server(self):
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(self.path)
+            listener.listen(1)
+            self.assertTrue(is_listening(self.path))
+            self.assertRaises(ValueError, CompileServer, self.path, {}, 1)
+            self.assertTrue(is_socket(self.path))
+        finally:
+            listener.close()
+
+    def test_replaces_a_stale_socket(self):
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        listener.close()
+        self.assertFalse(is_listening(self.path))
+        server = CompileServer(self.path, {}, 1)
+        try:
+            self.assertTrue(is_listening(self.path))
+        finally:
+            server.server_close()
+        self.assertFalse(os.path.lexists(self.path))
+
+    def test_bind_failure_starts_no_workers(self):
+        path = os.path.join(self.directory, 'missing', 'socket')
+        self.assertRaises(socket.error, CompileServer, path, {}, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+from bigrig import token as t
+
+from jscompiler.code_generator import generate_code, generate_string
+from jscompiler.locator_parser import make_string_parser
+from jscompiler.stats import VisitStats
+
+SOURCE = 'var a=1;function f(b){return typeof b}'
+
+# var a = 1 ; function f ( b ) { return typeof b }
+TOKEN_COUNT = 15
+
+
+def parse(source):
+    return make_string_parser(source).parse()
+
+
+class TokenCountTestCase(unittest.TestCase):
+    def test_string_generator_counts_every_token(self):
+        stats = VisitStats()
+        generate_string(parse(SOURCE), stats)
+        self.assertEqual(sum(stats.tokens.values()), TOKEN_COUNT)
+        self.assertEqual(stats.tokens[t.IDENTIFIER], 4)
+        self.assertEqual(stats.tokens[t.DECIMAL], 1)
+
+    def test_generators_agree(self):
+        string_stats = VisitStats()
+        generate_string(parse(SOURCE), string_stats)
+        token_stats = VisitStats()
+        generate_code(parse(SOURCE), None, token_stats)
+        self.assertEqual(
+            sum(string_stats.tokens.values()),
+            sum(token_stats.tokens.values())
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from jscompiler import minify, stream_input
+
+SOURCES = [
+    'var a = 1; var b = a + 2',
+    'function first(value) { return value * 2 }\n'
+    'function second() { return first(3) }\n'
+    'second();',
+    'if (a) b(); else c()\nfor (;;) break\nvar total = 0',
+    'var f = function (longname) { return longname };\n'
+    'while (f(1)) { f = null }',
+]
+
+
+class StreamInputTestCase(unittest.TestCase):
+    def stream(self, source, **options):
+        fd, filename = tempfile.mkstemp(suffix='.js')
+        try:
+            with os.fdopen(fd, 'wb') as output:
+                output.write(source)
+            outfile = StringIO()
+            with open(filename, 'rb') as input:
+                stream_input(input, outfile, **options)
+            return outfile.getvalue()
+        finally:
+            os.remove(filename)
+
+    def test_matches_whole_program_output(self):
+        for source in SOURCES:
+            self.assertEqual(self.stream(source), minify(source))
+
+    def test_matches_whole_program_output_renamed(self):
+        for source in SOURCES:
+            self.assertEqual(
+                self.stream(source, rename=True), minify(source, rename=True)
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from bigrig import ast
+
+from jscompiler.visitor import NodeVisitor, get_dispatch_table
+
+
+class NameCollector(NodeVisitor):
+    def __init__(self):
+        self.names = []
+        super(NameCollector, self).__init__()
+
+    def visit_Name(self, node):
+        self.names.append(node.value)
+
+
+class DispatchTableTestCase(unittest.TestCase):
+    def test_unhandled_classes_use_generic_visit(self):
+        table = get_dispatch_table(NameCollector)
+        generic_visit = NameCollector.generic_visit.__func__
+        self.assertTrue(table[ast.Name] is NameCollector.visit_Name.__func__)
+        self.assertTrue(table[ast.Program] is generic_visit)
+        visitor = NameCollector()
+        visitor.visit([])
+        self.assertTrue(visitor.dispatch_table[list] is generic_visit)
+
+    def test_visits_nested_names(self):
+        from jscompiler.locator_parser import parse_string
+        visitor = NameCollector()
+        visitor.visit(parse_string('a(b, [c]); function f() { return d }'))
+        self.assertEqual(visitor.names, [u'a', u'b', u'c', u'd'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from jscompiler.watch import Watcher
+
+
+class WatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.directory, 'src')
+        self.output_dir = os.path.join(self.directory, 'build')
+        os.mkdir(self.source_dir)
+        self.errors = StringIO()
+        self.watcher = Watcher(
+            self.source_dir, self.output_dir, errors=self.errors
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, source):
+        with open(os.path.join(self.source_dir, name), 'wb') as fd:
+            fd.write(source)
+
+    def test_rebuilds_only_changed_files(self):
+        self.write('a.js', 'var a = 1;')
+        self.write('b.js', 'var b = 2;')
+        self.assertEqual(self.watcher.poll(), 2)
+        self.assertEqual(self.watcher.poll(), 0)
+        self.write('a.js', 'var a = 10;')
+        self.assertEqual(self.watcher.poll(), 1)
+        with open(os.path.join(self.output_dir, 'a.js'), 'rb') as fd:
+            self.assertEqual(fd.read(), 'var a=10')
+
+    def test_removed_files_lose_their_output(self):
+        self.write('a.js', 'var a = 1;')
+        self.watcher.poll()
+        os.unlink(os.path.join(self.source_dir, 'a.js'))
+        self.assertEqual(self.watcher.poll(), 1)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.output_dir, 'a.js'))
+        )
+
+    def test_errors_keep_watching(self):
+        self.write('bad.js', 'var = ;')
+        self.write('good.js', 'var good = 1;')
+        self.assertEqual(self.watcher.poll(), 2)
+        self.assertTrue('bad.js' in self.errors.getvalue())
+        self.assertTrue(
+            os.path.exists(os.path.join(self.output_dir, 'good.js'))
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()